@@ -56,12 +56,26 @@ export function deletePermission(id) {
     })
 }
 
+// 权限树缓存: 携带上次的 ETag 请求,权限未变更时服务端返回 304,不重复传输权限树
+let permissionTreeCache = null
+
 /**
- * 获取权限树
+ * 获取权限树(按编码前缀分组)
  */
-export function getPermissionTree() {
-    return request({
+export async function getPermissionTree() {
+    const response = await request({
         url: '/api/v1/admin/permissions/tree',
-        method: 'get'
+        method: 'get',
+        headers: permissionTreeCache ? { 'If-None-Match': permissionTreeCache.etag } : {},
+        validateStatus: status => (status >= 200 && status < 300) || status === 304,
+        rawResponse: true
     })
+
+    if (response.status === 304 && permissionTreeCache) {
+        return permissionTreeCache.data
+    }
+
+    const etag = response.headers.etag
+    permissionTreeCache = etag ? { etag, data: response.data } : null
+    return response.data
 }
@@ -61,9 +61,12 @@ export const useAuthStore = defineStore('auth', () => {
             const res = await authApi.refreshToken(refresh)
 
             if (res.code === 200) {
-                const { access_token } = res.data
+                // refresh token 每次刷新都会轮换,旧值随即失效
+                const { access_token, refresh_token } = res.data
                 token.value = access_token
+                refreshTokenValue.value = refresh_token
                 setToken(access_token)
+                setRefreshToken(refresh_token)
                 return access_token
             }
 
@@ -40,6 +40,10 @@ request.interceptors.request.use(
 // 响应拦截器
 request.interceptors.response.use(
     response => {
+        // rawResponse: 需要读取状态码与响应头(如 ETag 协商缓存)的请求返回完整响应
+        if (response.config.rawResponse) {
+            return response
+        }
         // 返回 data 字段
         return response.data
     },
@@ -36,7 +36,8 @@ CREATE TABLE admin_user (
     INDEX idx_phone (phone),
     INDEX idx_status (status),
     INDEX idx_deleted_at (deleted_at),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    FULLTEXT INDEX ft_admin_user_search (username, real_name) WITH PARSER ngram
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='管理端用户表';
 
 -- ============================================
@@ -82,6 +83,7 @@ DROP TABLE IF EXISTS admin_menu;
 CREATE TABLE admin_menu (
     id BIGINT PRIMARY KEY AUTO_INCREMENT COMMENT '菜单ID',
     parent_id BIGINT DEFAULT 0 COMMENT '父菜单ID(0为根节点)',
+    tree_path VARCHAR(255) NOT NULL COMMENT '物化路径(如: /2/10/),用于子树和祖先查询',
     name VARCHAR(50) NOT NULL COMMENT '菜单名称',
     path VARCHAR(200) COMMENT '路由路径(如: /system/user)',
     component VARCHAR(200) COMMENT '组件路径(如: views/system/user/index.vue)',
@@ -97,6 +99,7 @@ CREATE TABLE admin_menu (
     deleted_at DATETIME COMMENT '删除时间(软删除)',
     
     INDEX idx_parent_id (parent_id),
+    INDEX idx_tree_path (tree_path),
     INDEX idx_level (level),
     INDEX idx_sort (sort),
     INDEX idx_status (status),
@@ -262,17 +265,17 @@ INSERT INTO admin_permission (id, name, code, type, description) VALUES
 (91, '示例列表', 'sys:demo:list', 'API', '示例列表');
 
 -- 3. 插入默认菜单(树形结构)
-INSERT INTO admin_menu (id, parent_id, name, path, component, icon, level, sort, hidden, keep_alive, status) VALUES
+INSERT INTO admin_menu (id, parent_id, tree_path, name, path, component, icon, level, sort, hidden, keep_alive, status) VALUES
 -- 一级菜单
-(1, 0, '仪表盘', '/dashboard', 'views/dashboard/index.vue', 'Dashboard', 1, 1, 0, 1, 1),
-(2, 0, '系统管理', '/system', 'Layout', 'Setting', 1, 2, 0, 1, 1),
+(1, 0, '/1/', '仪表盘', '/dashboard', 'views/dashboard/index.vue', 'Dashboard', 1, 1, 0, 1, 1),
+(2, 0, '/2/', '系统管理', '/system', 'Layout', 'Setting', 1, 2, 0, 1, 1),
 
 -- 二级菜单(系统管理下)
-(10, 2, '用户管理', '/system/user', 'views/system/user/index.vue', 'User', 2, 1, 0, 1, 1),
-(11, 2, '角色管理', '/system/role', 'views/system/role/index.vue', 'UserFilled', 2, 2, 0, 1, 1),
-(12, 2, '权限管理', '/system/permission', 'views/system/permission/index.vue', 'Lock', 2, 3, 0, 1, 1),
-(13, 2, '菜单管理', '/system/menu', 'views/system/menu/index.vue', 'Menu', 2, 4, 0, 1, 1),
-(14, 2, '审计日志', '/system/audit', 'views/system/audit/index.vue', 'Document', 2, 5, 0, 1, 1);
+(10, 2, '/2/10/', '用户管理', '/system/user', 'views/system/user/index.vue', 'User', 2, 1, 0, 1, 1),
+(11, 2, '/2/11/', '角色管理', '/system/role', 'views/system/role/index.vue', 'UserFilled', 2, 2, 0, 1, 1),
+(12, 2, '/2/12/', '权限管理', '/system/permission', 'views/system/permission/index.vue', 'Lock', 2, 3, 0, 1, 1),
+(13, 2, '/2/13/', '菜单管理', '/system/menu', 'views/system/menu/index.vue', 'Menu', 2, 4, 0, 1, 1),
+(14, 2, '/2/14/', '审计日志', '/system/audit', 'views/system/audit/index.vue', 'Document', 2, 5, 0, 1, 1);
 
 -- 4. 超级管理员角色分配所有权限
 INSERT INTO admin_role_permission (role_id, permission_id)
@@ -329,6 +332,7 @@ WHERE id IN (1, 2, 10, 11, 14);
 4. admin_menu (菜单表 - 树形结构)
    - id: 菜单唯一标识
    - parent_id: 父菜单 ID(0 为根节点)
+   - tree_path: 物化路径(如 /2/10/),子树删除、移动和面包屑均为单条 SQL
    - name: 菜单显示名称
    - path: 前端路由路径
    - component: Vue 组件路径
@@ -0,0 +1,61 @@
+"""add menu tree_path
+
+Revision ID: 5b2e9c1d7a40
+Revises: 98d4de7c7623
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c1d7a40'
+down_revision: Union[str, None] = '98d4de7c7623'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'admin_menu',
+        sa.Column('tree_path', sa.String(length=255), nullable=False, server_default='', comment='物化路径(如: /2/10/),用于子树和祖先查询')
+    )
+    op.create_index('ix_admin_menu_tree_path', 'admin_menu', ['tree_path'])
+
+    # 回填已有菜单的物化路径(包含已软删除的菜单)
+    bind = op.get_bind()
+    rows = bind.execute(sa.text('SELECT id, parent_id FROM admin_menu')).fetchall()
+    parents = {row[0]: row[1] for row in rows}
+    paths = {}
+
+    def build_path(menu_id: int) -> str:
+        if menu_id in paths:
+            return paths[menu_id]
+        parent_id = parents.get(menu_id, 0)
+        prefix = build_path(parent_id) if parent_id in parents else '/'
+        paths[menu_id] = f'{prefix}{menu_id}/'
+        return paths[menu_id]
+
+    for menu_id in parents:
+        bind.execute(
+            sa.text('UPDATE admin_menu SET tree_path = :tree_path WHERE id = :id'),
+            {'tree_path': build_path(menu_id), 'id': menu_id}
+        )
+
+    # 回填后去掉默认值: 未写入路径的插入直接失败,避免空路径让前缀匹配覆盖全表
+    op.alter_column(
+        'admin_menu',
+        'tree_path',
+        existing_type=sa.String(length=255),
+        existing_nullable=False,
+        existing_comment='物化路径(如: /2/10/),用于子树和祖先查询',
+        server_default=None
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_admin_menu_tree_path', table_name='admin_menu')
+    op.drop_column('admin_menu', 'tree_path')
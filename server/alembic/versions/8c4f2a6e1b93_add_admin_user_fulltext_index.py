@@ -0,0 +1,37 @@
+"""add admin_user ngram fulltext index
+
+Revision ID: 8c4f2a6e1b93
+Revises: 5b2e9c1d7a40
+Create Date: 2026-10-18 14:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2a6e1b93'
+down_revision: Union[str, None] = '5b2e9c1d7a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+
+    # ngram 分词会丢弃包含停用词(如 in/on/at)的词元,导致短语匹配漏查,建索引时关闭停用词
+    op.execute('SET SESSION innodb_ft_enable_stopword = OFF')
+    op.execute(
+        'CREATE FULLTEXT INDEX ft_admin_user_search '
+        'ON admin_user (username, real_name) WITH PARSER ngram'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+
+    op.drop_index('ft_admin_user_search', table_name='admin_user')
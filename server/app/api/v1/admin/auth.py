@@ -1,10 +1,10 @@
 """
 管理端认证路由
 """
+from typing import Optional
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import PrimaryReadDB, WriteDB
 from app.schemas.auth import (
     LoginRequest,
     TokenResponse,
@@ -15,9 +15,10 @@ from app.schemas.auth import (
 )
 from app.schemas.response import success_response
 from app.services.auth_service import AuthService
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_principal, get_current_session_id, Principal
 from app.models.user import AdminUser
 from app.services.permission_service import PermissionService
+from app.utils.rate_limit import check_login_limit, clear_login_limit
 
 router = APIRouter()
 
@@ -26,7 +27,7 @@ router = APIRouter()
 async def login(
     request: Request,
     login_data: LoginRequest,
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB
 ):
     """
     管理员登录
@@ -44,6 +45,9 @@ async def login(
     # 获取客户端 IP
     ip_address = request.client.host if request.client else ""
     
+    # 登录限流(IP 与账号两个维度)
+    await check_login_limit(ip_address, login_data.username)
+    
     # 执行登录
     token_response = await AuthService.login(
         db=db,
@@ -51,6 +55,7 @@ async def login(
         password=login_data.password,
         ip_address=ip_address
     )
+    await clear_login_limit(ip_address, login_data.username)
     
     return success_response(
         data=token_response.model_dump(),
@@ -91,6 +96,7 @@ async def refresh_token(
 @router.get("/me", response_model=dict)
 async def get_current_user_info(
     request: Request,
+    db: PrimaryReadDB,
     current_user: AdminUser = Depends(get_current_user)
 ):
     """
@@ -99,6 +105,7 @@ async def get_current_user_info(
     Args:
         request: 请求对象
         current_user: 当前用户
+        db: 数据库会话
         
     Returns:
         dict: 用户信息
@@ -107,7 +114,8 @@ async def get_current_user_info(
     
     # 构建用户信息响应
     user_info = UserInfoResponse.model_validate(current_user)
-    permissions = sorted(PermissionService.get_user_permissions(current_user))
+    snapshot = await PermissionService.get_snapshot(db, current_user.id)
+    permissions = sorted(snapshot.permissions)
     
     return success_response(
         data={**user_info.model_dump(), "permissions": permissions},
@@ -120,7 +128,7 @@ async def get_current_user_info(
 async def logout(
     request: Request,
     logout_data: LogoutRequest,
-    current_user: AdminUser = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     用户登出
@@ -146,3 +154,85 @@ async def logout(
         message="登出成功",
         trace_id=trace_id
     )
+
+
+@router.post("/logout-all", response_model=dict)
+async def logout_all(
+    request: Request,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    退出所有设备
+    
+    Args:
+        request: 请求对象
+        current_user: 当前用户
+    
+    Returns:
+        dict: 登出响应
+    """
+    trace_id = getattr(request.state, "trace_id", "")
+    
+    await AuthService.logout_all(current_user.id)
+    
+    return success_response(
+        data=None,
+        message="已退出所有设备",
+        trace_id=trace_id
+    )
+
+
+@router.get("/sessions", response_model=dict)
+async def list_sessions(
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    session_id: Optional[str] = Depends(get_current_session_id)
+):
+    """
+    获取当前用户的登录会话列表
+    
+    Args:
+        request: 请求对象
+        current_user: 当前用户
+        session_id: 当前会话 ID
+    
+    Returns:
+        dict: 会话列表
+    """
+    trace_id = getattr(request.state, "trace_id", "")
+    
+    sessions = await AuthService.list_sessions(current_user.id, session_id)
+    
+    return success_response(
+        data=[item.model_dump() for item in sessions],
+        message="获取会话列表成功",
+        trace_id=trace_id
+    )
+
+
+@router.delete("/sessions/{session_id}", response_model=dict)
+async def revoke_session(
+    request: Request,
+    session_id: str,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    吊销指定会话(使对应设备的 Refresh Token 失效)
+    
+    Args:
+        request: 请求对象
+        session_id: 会话 ID
+        current_user: 当前用户
+    
+    Returns:
+        dict: 操作响应
+    """
+    trace_id = getattr(request.state, "trace_id", "")
+    
+    await AuthService.revoke_session(current_user.id, session_id)
+    
+    return success_response(
+        data=None,
+        message="会话已吊销",
+        trace_id=trace_id
+    )
@@ -1,26 +1,28 @@
 """
 菜单管理路由
 """
+from typing import List
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 
-from app.db.session import get_db
-from app.models.user import AdminUser
+from app.db.session import ReadDB, PrimaryReadDB, WriteDB
 from app.schemas.menu import MenuCreate, MenuUpdate, MenuTreeNode, MenuRoute, MenuSortUpdate
-from app.schemas.response import success_response
+from app.schemas.response import success_response, raw_success_response
 from app.services.menu_service import MenuService
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_principal, Principal
 from app.core.permissions import require_perm
 
 router = APIRouter()
 
+_menu_tree_adapter = TypeAdapter(List[MenuTreeNode])
+
 
 @router.get("/tree", response_model=dict)
 async def get_menu_tree(
     request: Request,
+    db: ReadDB,
     include_disabled: bool = False,
-    current_user: AdminUser = Depends(require_perm("sys:menu:list")),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(require_perm("sys:menu:list"))
 ):
     """
     获取菜单树
@@ -38,8 +40,8 @@ async def get_menu_tree(
     
     tree = await MenuService.get_menu_tree(db, include_disabled)
     
-    return success_response(
-        data=[node.model_dump() for node in tree],
+    return raw_success_response(
+        _menu_tree_adapter.dump_json(tree),
         message="获取菜单树成功",
         trace_id=trace_id
     )
@@ -48,8 +50,8 @@ async def get_menu_tree(
 @router.get("/my", response_model=dict)
 async def get_my_menu_tree(
     request: Request,
-    current_user: AdminUser = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: PrimaryReadDB,
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     获取我的菜单树(用于前端动态路由)
@@ -64,21 +66,59 @@ async def get_my_menu_tree(
     """
     trace_id = getattr(request.state, "trace_id", "")
     
-    routes = await MenuService.get_my_menu_tree(db, current_user)
+    routes_json = await MenuService.get_my_menu_tree(db, current_user)
     
-    return success_response(
-        data=[route.model_dump() for route in routes],
+    return raw_success_response(
+        routes_json,
         message="获取我的菜单树成功",
         trace_id=trace_id
     )
 
 
+@router.get("/{menu_id}/breadcrumb", response_model=dict)
+async def get_menu_breadcrumb(
+    request: Request,
+    menu_id: int,
+    db: ReadDB,
+    current_user: Principal = Depends(require_perm("sys:menu:list"))
+):
+    """
+    获取菜单面包屑(从根菜单到当前菜单)
+    
+    Args:
+        request: 请求对象
+        menu_id: 菜单 ID
+        current_user: 当前用户
+        db: 数据库会话
+    
+    Returns:
+        dict: 祖先菜单列表
+    """
+    trace_id = getattr(request.state, "trace_id", "")
+    
+    ancestors = await MenuService.get_ancestors(db, menu_id)
+    
+    return success_response(
+        data=[
+            {
+                "id": menu.id,
+                "name": menu.name,
+                "title": menu.title,
+                "path": menu.path
+            }
+            for menu in ancestors
+        ],
+        message="获取面包屑成功",
+        trace_id=trace_id
+    )
+
+
 @router.post("", response_model=dict)
 async def create_menu(
     request: Request,
     menu_data: MenuCreate,
-    current_user: AdminUser = Depends(require_perm("sys:menu:create")),
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:menu:create"))
 ):
     """
     创建菜单
@@ -112,8 +152,8 @@ async def update_menu(
     request: Request,
     menu_id: int,
     menu_data: MenuUpdate,
-    current_user: AdminUser = Depends(require_perm("sys:menu:update")),
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:menu:update"))
 ):
     """
     更新菜单
@@ -150,8 +190,8 @@ async def update_menu(
 async def delete_menu(
     request: Request,
     menu_id: int,
-    current_user: AdminUser = Depends(require_perm("sys:menu:delete")),
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:menu:delete"))
 ):
     """
     删除菜单(级联删除子菜单)
@@ -181,8 +221,8 @@ async def update_menu_sort(
     request: Request,
     menu_id: int,
     sort_data: MenuSortUpdate,
-    current_user: AdminUser = Depends(require_perm("sys:menu:update")),
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:menu:update"))
 ):
     """
     更新菜单排序
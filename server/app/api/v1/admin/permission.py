@@ -1,66 +1,65 @@
 """
 权限管理路由
 """
+from typing import List
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete
 
-from app.db.session import get_db
-from app.models.user import AdminUser
+from app.db.session import ReadDB, PrimaryReadDB, WriteDB, after_commit
 from app.models.permission import AdminPermission
-from app.schemas.permission import PermissionCreate, PermissionUpdate, PermissionResponse
-from app.schemas.response import success_response
+from app.models.associations import admin_role_permission
+from app.models.loading import load_columns
+from app.schemas.permission import PermissionCreate, PermissionUpdate, PermissionResponse, PermissionTreeNode
+from app.schemas.response import ResponseModel, success_response, typed_response, etag_response
+from app.services.permission_service import PermissionService
+from app.core.dependencies import Principal
 from app.core.permissions import require_perm
 from app.core.exceptions import NotFoundException, BadRequestException
 
 router = APIRouter()
 
 
-@router.get("", response_model=dict)
+@router.get("", response_model=ResponseModel[List[PermissionResponse]])
 async def get_permission_list(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:permission:list"))
+    db: PrimaryReadDB,
+    current_user: Principal = Depends(require_perm("sys:permission:list"))
 ):
-    """获取权限列表"""
-    trace_id = getattr(request.state, "trace_id", "")
+    """
+    获取权限列表
     
-    stmt = select(AdminPermission).where(AdminPermission.deleted_at.is_(None)).order_by(AdminPermission.id)
-    result = await db.execute(stmt)
-    permissions = result.scalars().all()
+    返回缓存的权限目录并带 ETag,If-None-Match 匹配时返回 304。
+    """
+    trace_id = getattr(request.state, "trace_id", "")
     
-    return success_response(
-        data=[PermissionResponse.model_validate(p).model_dump() for p in permissions],
-        trace_id=trace_id
-    )
+    etag, data_json = await PermissionService.get_catalog(db, "list")
+    return etag_response(request, data_json, etag, trace_id=trace_id)
 
 
-@router.get("/tree", response_model=dict)
+@router.get("/tree", response_model=ResponseModel[List[PermissionTreeNode]])
 async def get_permission_tree(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:permission:list"))
+    db: PrimaryReadDB,
+    current_user: Principal = Depends(require_perm("sys:permission:list"))
 ):
-    """获取权限树(用于角色绑定)"""
-    trace_id = getattr(request.state, "trace_id", "")
+    """
+    获取权限树(用于角色绑定)
     
-    stmt = select(AdminPermission).where(AdminPermission.deleted_at.is_(None)).order_by(AdminPermission.id)
-    result = await db.execute(stmt)
-    permissions = result.scalars().all()
+    权限按编码前缀分组(如 sys:user:*),返回缓存的权限目录并带 ETag,
+    权限未变更时重复打开角色绑定页只需一次 304 往返。
+    """
+    trace_id = getattr(request.state, "trace_id", "")
     
-    # 简单返回列表,前端可以按需构建树
-    return success_response(
-        data=[{"id": p.id, "name": p.name, "code": p.code, "type": p.type} for p in permissions],
-        trace_id=trace_id
-    )
+    etag, data_json = await PermissionService.get_catalog(db, "tree")
+    return etag_response(request, data_json, etag, trace_id=trace_id)
 
 
-@router.post("", response_model=dict)
+@router.post("", response_model=ResponseModel[PermissionResponse])
 async def create_permission(
     request: Request,
     perm_data: PermissionCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:permission:create"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:permission:create"))
 ):
     """创建权限"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -78,51 +77,54 @@ async def create_permission(
         description=perm_data.description
     )
     db.add(permission)
-    await db.commit()
+    await db.flush()
     await db.refresh(permission)
+    after_commit(db, PermissionService.invalidate_catalog)
     
-    return success_response(
-        data=PermissionResponse.model_validate(permission).model_dump(),
+    return typed_response(
+        PermissionResponse,
+        permission,
         message="创建成功",
         trace_id=trace_id
     )
 
 
-@router.get("/{id}", response_model=dict)
+@router.get("/{id}", response_model=ResponseModel[PermissionResponse])
 async def get_permission(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:permission:detail"))
+    db: ReadDB,
+    current_user: Principal = Depends(require_perm("sys:permission:detail"))
 ):
     """获取权限详情"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminPermission).where(AdminPermission.id == id, AdminPermission.deleted_at.is_(None))
+    stmt = select(*load_columns(AdminPermission, PermissionResponse)).where(AdminPermission.id == id)
     result = await db.execute(stmt)
-    permission = result.scalar_one_or_none()
+    permission = result.one_or_none()
     
     if not permission:
         raise NotFoundException("权限不存在")
     
-    return success_response(
-        data=PermissionResponse.model_validate(permission).model_dump(),
+    return typed_response(
+        PermissionResponse,
+        permission,
         trace_id=trace_id
     )
 
 
-@router.put("/{id}", response_model=dict)
+@router.put("/{id}", response_model=ResponseModel[PermissionResponse])
 async def update_permission(
     request: Request,
     id: int,
     perm_data: PermissionUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:permission:update"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:permission:update"))
 ):
     """更新权限"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminPermission).where(AdminPermission.id == id, AdminPermission.deleted_at.is_(None))
+    stmt = select(AdminPermission).where(AdminPermission.id == id)
     result = await db.execute(stmt)
     permission = result.scalar_one_or_none()
     
@@ -133,11 +135,14 @@ async def update_permission(
     for key, value in update_data.items():
         setattr(permission, key, value)
     
-    await db.commit()
+    await db.flush()
     await db.refresh(permission)
+    after_commit(db, PermissionService.invalidate_snapshots)
+    after_commit(db, PermissionService.invalidate_catalog)
     
-    return success_response(
-        data=PermissionResponse.model_validate(permission).model_dump(),
+    return typed_response(
+        PermissionResponse,
+        permission,
         message="更新成功",
         trace_id=trace_id
     )
@@ -147,21 +152,23 @@ async def update_permission(
 async def delete_permission(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:permission:delete"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:permission:delete"))
 ):
     """删除权限"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminPermission).where(AdminPermission.id == id, AdminPermission.deleted_at.is_(None))
+    stmt = select(AdminPermission).where(AdminPermission.id == id)
     result = await db.execute(stmt)
     permission = result.scalar_one_or_none()
     
     if not permission:
         raise NotFoundException("权限不存在")
     
-    from datetime import datetime
-    permission.deleted_at = datetime.now()
-    await db.commit()
+    # admin_permission 表没有 deleted_at 列,直接删除权限及其角色关联
+    await db.execute(delete(admin_role_permission).where(admin_role_permission.c.permission_id == id))
+    await db.execute(delete(AdminPermission).where(AdminPermission.id == id))
+    after_commit(db, PermissionService.invalidate_snapshots)
+    after_commit(db, PermissionService.invalidate_catalog)
     
     return success_response(message="删除成功", trace_id=trace_id)
@@ -1,49 +1,52 @@
 """
 角色管理路由
 """
+from typing import List
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
-from app.db.session import get_db
-from app.models.user import AdminUser
+from app.db.session import ReadDB, WriteDB, after_commit
 from app.models.role import AdminRole
 from app.models.permission import AdminPermission
 from app.models.menu import AdminMenu
+from app.models.loading import load_profile, load_columns
 from app.schemas.role import RoleCreate, RoleUpdate, RoleResponse, AssignPermissionsRequest, AssignMenusRequest
-from app.schemas.response import success_response
+from app.schemas.response import ResponseModel, success_response, typed_response
+from app.services.permission_service import PermissionService
+from app.services.menu_service import MenuService
+from app.core.dependencies import Principal
 from app.core.permissions import require_perm
 from app.core.exceptions import NotFoundException, BadRequestException
 
 router = APIRouter()
 
 
-@router.get("", response_model=dict)
+@router.get("", response_model=ResponseModel[List[RoleResponse]])
 async def get_role_list(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:list"))
+    db: ReadDB,
+    current_user: Principal = Depends(require_perm("sys:role:list"))
 ):
     """获取角色列表"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminRole).where(AdminRole.deleted_at.is_(None)).order_by(AdminRole.id)
+    stmt = (
+        select(*load_columns(AdminRole, RoleResponse))
+        .where(AdminRole.deleted_at.is_(None))
+        .order_by(AdminRole.id)
+    )
     result = await db.execute(stmt)
-    roles = result.scalars().all()
+    roles = result.all()
     
-    return success_response(
-        data=[RoleResponse.model_validate(r).model_dump() for r in roles],
-        trace_id=trace_id
-    )
+    return typed_response(List[RoleResponse], roles, trace_id=trace_id)
 
 
-@router.post("", response_model=dict)
+@router.post("", response_model=ResponseModel[RoleResponse])
 async def create_role(
     request: Request,
     role_data: RoleCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:create"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:role:create"))
 ):
     """创建角色"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -61,46 +64,48 @@ async def create_role(
         status=role_data.status
     )
     db.add(role)
-    await db.commit()
+    await db.flush()
     await db.refresh(role)
     
-    return success_response(
-        data=RoleResponse.model_validate(role).model_dump(),
+    return typed_response(
+        RoleResponse,
+        role,
         message="创建成功",
         trace_id=trace_id
     )
 
 
-@router.get("/{id}", response_model=dict)
+@router.get("/{id}", response_model=ResponseModel[RoleResponse])
 async def get_role(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:detail"))
+    db: ReadDB,
+    current_user: Principal = Depends(require_perm("sys:role:detail"))
 ):
     """获取角色详情"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminRole).where(AdminRole.id == id, AdminRole.deleted_at.is_(None))
+    stmt = select(*load_columns(AdminRole, RoleResponse)).where(AdminRole.id == id, AdminRole.deleted_at.is_(None))
     result = await db.execute(stmt)
-    role = result.scalar_one_or_none()
+    role = result.one_or_none()
     
     if not role:
         raise NotFoundException("角色不存在")
     
-    return success_response(
-        data=RoleResponse.model_validate(role).model_dump(),
+    return typed_response(
+        RoleResponse,
+        role,
         trace_id=trace_id
     )
 
 
-@router.put("/{id}", response_model=dict)
+@router.put("/{id}", response_model=ResponseModel[RoleResponse])
 async def update_role(
     request: Request,
     id: int,
     role_data: RoleUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:update"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:role:update"))
 ):
     """更新角色"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -116,11 +121,12 @@ async def update_role(
     for key, value in update_data.items():
         setattr(role, key, value)
     
-    await db.commit()
+    await db.flush()
     await db.refresh(role)
     
-    return success_response(
-        data=RoleResponse.model_validate(role).model_dump(),
+    return typed_response(
+        RoleResponse,
+        role,
         message="更新成功",
         trace_id=trace_id
     )
@@ -130,8 +136,8 @@ async def update_role(
 async def delete_role(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:delete"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:role:delete"))
 ):
     """删除角色"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -148,7 +154,7 @@ async def delete_role(
     
     from datetime import datetime
     role.deleted_at = datetime.now()
-    await db.commit()
+    after_commit(db, PermissionService.invalidate_snapshots)
     
     return success_response(message="删除成功", trace_id=trace_id)
 
@@ -157,13 +163,13 @@ async def delete_role(
 async def get_role_permissions(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:assign:permission"))
+    db: ReadDB,
+    current_user: Principal = Depends(require_perm("sys:role:assign:permission"))
 ):
     """获取角色权限"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminRole).options(selectinload(AdminRole.permissions)).where(AdminRole.id == id)
+    stmt = select(AdminRole).options(*load_profile(AdminRole, "permissions")).where(AdminRole.id == id)
     result = await db.execute(stmt)
     role = result.scalar_one_or_none()
     
@@ -181,13 +187,13 @@ async def assign_permissions(
     request: Request,
     id: int,
     assign_data: AssignPermissionsRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:assign:permission"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:role:assign:permission"))
 ):
     """绑定权限"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminRole).options(selectinload(AdminRole.permissions)).where(AdminRole.id == id)
+    stmt = select(AdminRole).options(*load_profile(AdminRole, "permissions")).where(AdminRole.id == id)
     result = await db.execute(stmt)
     role = result.scalar_one_or_none()
     
@@ -199,7 +205,7 @@ async def assign_permissions(
     permissions = perm_result.scalars().all()
     
     role.permissions = list(permissions)
-    await db.commit()
+    after_commit(db, PermissionService.invalidate_snapshots)
     
     return success_response(message="权限绑定成功", trace_id=trace_id)
 
@@ -208,13 +214,13 @@ async def assign_permissions(
 async def get_role_menus(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:assign:menu"))
+    db: ReadDB,
+    current_user: Principal = Depends(require_perm("sys:role:assign:menu"))
 ):
     """获取角色菜单"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminRole).options(selectinload(AdminRole.menus)).where(AdminRole.id == id)
+    stmt = select(AdminRole).options(*load_profile(AdminRole, "menus")).where(AdminRole.id == id)
     result = await db.execute(stmt)
     role = result.scalar_one_or_none()
     
@@ -232,13 +238,13 @@ async def assign_menus(
     request: Request,
     id: int,
     assign_data: AssignMenusRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:role:assign:menu"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:role:assign:menu"))
 ):
     """绑定菜单"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminRole).options(selectinload(AdminRole.menus)).where(AdminRole.id == id)
+    stmt = select(AdminRole).options(*load_profile(AdminRole, "menus")).where(AdminRole.id == id)
     result = await db.execute(stmt)
     role = result.scalar_one_or_none()
     
@@ -250,6 +256,6 @@ async def assign_menus(
     menus = menu_result.scalars().all()
     
     role.menus = list(menus)
-    await db.commit()
+    after_commit(db, MenuService.invalidate_cache)
     
     return success_response(message="菜单绑定成功", trace_id=trace_id)
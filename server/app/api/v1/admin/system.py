@@ -0,0 +1,64 @@
+"""
+系统监控路由
+"""
+from fastapi import APIRouter, Depends, Request
+
+from app.db.session import pool_stats, replica_router
+from app.schemas.response import success_response
+from app.core.dependencies import Principal
+from app.core.permissions import require_super_admin
+from app.core.security import crypto
+
+router = APIRouter()
+
+
+@router.get("/db-pool", response_model=dict)
+async def get_db_pool_stats(
+    request: Request,
+    current_user: Principal = Depends(require_super_admin())
+):
+    """
+    获取数据库连接池状态(仅超级管理员)
+    
+    返回各引擎当前借出/溢出连接数、建连/失效/ping 次数、借出超时次数
+    与借出等待耗时直方图,用于判断延迟尖刺是否来自连接池耗尽。
+    
+    Args:
+        request: 请求对象
+        current_user: 当前用户
+        
+    Returns:
+        dict: 连接池状态
+    """
+    trace_id = getattr(request.state, "trace_id", "")
+    
+    return success_response(
+        data={
+            "pools": pool_stats(),
+            "replica_router": replica_router.stats()
+        },
+        trace_id=trace_id
+    )
+
+
+@router.get("/crypto", response_model=dict)
+async def get_crypto_stats(
+    request: Request,
+    current_user: Principal = Depends(require_super_admin())
+):
+    """
+    获取认证加解密状态(仅超级管理员)
+    
+    返回 JWT 算法与实现、已验证 Token 缓存命中情况,以及密码哈希线程池的
+    队列深度与拒绝次数(队列满时登录返回 503)。
+    
+    Args:
+        request: 请求对象
+        current_user: 当前用户
+        
+    Returns:
+        dict: 加解密状态
+    """
+    trace_id = getattr(request.state, "trace_id", "")
+    
+    return success_response(data=crypto.stats(), trace_id=trace_id)
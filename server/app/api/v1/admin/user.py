@@ -1,75 +1,164 @@
 """
 用户管理路由
 """
-from typing import Optional
+from typing import Optional, Union
 from fastapi import APIRouter, Depends, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from passlib.context import CryptContext
+from sqlalchemy import select, func, or_
+from sqlalchemy.dialects.mysql import match
 
-from app.db.session import get_db
+from app.db.session import ReadDB, WriteDB, after_commit
+from app.db.redis import redis_client
 from app.models.user import AdminUser
 from app.models.role import AdminRole
+from app.models.loading import load_profile, load_columns
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, ResetPasswordRequest, AssignRolesRequest
-from app.schemas.response import success_response
+from app.schemas.response import ResponseModel, PageData, CursorPageData, success_response, typed_response
+from app.services.permission_service import PermissionService
+from app.core.dependencies import Principal
 from app.core.permissions import require_perm
+from app.core.config import settings
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.security import hash_password
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-@router.get("", response_model=dict)
+# 未带筛选条件时的用户总数缓存键(近似值,创建/删除用户时清除)
+USER_COUNT_CACHE_KEY = "admin_user:count"
+
+
+@router.get("", response_model=ResponseModel[Union[PageData[UserResponse], CursorPageData[UserResponse]]])
 async def get_user_list(
     request: Request,
+    db: ReadDB,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     username: Optional[str] = None,
     real_name: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:user:list"))
+    q: Optional[str] = Query(None, max_length=50, description="关键字(同时搜索用户名和真实姓名)"),
+    mode: str = Query("page", pattern="^(page|cursor)$", description="分页模式: page-页码, cursor-游标"),
+    cursor: Optional[str] = Query(None, description="游标(cursor 模式,取上一页返回的 next_cursor)"),
+    with_total: Optional[bool] = Query(None, description="是否返回总数(page 模式默认返回,cursor 模式默认不返回)"),
+    current_user: Principal = Depends(require_perm("sys:user:list"))
 ):
-    """获取用户列表"""
+    """
+    获取用户列表
+    
+    page 模式使用 OFFSET 分页;cursor 模式按 id 倒序做 keyset 分页
+    (WHERE id < 游标),翻到任意深度的耗时都与第一页相同。
+    """
     trace_id = getattr(request.state, "trace_id", "")
     
     # 构建查询
-    stmt = select(AdminUser).where(AdminUser.deleted_at.is_(None))
-    count_stmt = select(func.count(AdminUser.id)).where(AdminUser.deleted_at.is_(None))
-    
+    filters = [AdminUser.deleted_at.is_(None)]
     if username:
-        stmt = stmt.where(AdminUser.username.like(f"%{username}%"))
-        count_stmt = count_stmt.where(AdminUser.username.like(f"%{username}%"))
+        filters.append(AdminUser.username.like(f"%{username}%"))
     if real_name:
-        stmt = stmt.where(AdminUser.real_name.like(f"%{real_name}%"))
-        count_stmt = count_stmt.where(AdminUser.real_name.like(f"%{real_name}%"))
+        filters.append(AdminUser.real_name.like(f"%{real_name}%"))
+    if q and q.strip():
+        filters.append(_search_filter(db, q.strip()))
     
-    # 分页
-    stmt = stmt.offset((page - 1) * size).limit(size).order_by(AdminUser.id.desc())
+    # 只查询响应所需的列,结果为行元组,不构建 ORM 实体
+    stmt = select(*load_columns(AdminUser, UserResponse)).where(*filters).order_by(AdminUser.id.desc())
     
-    # 执行查询
-    result = await db.execute(stmt)
-    users = result.scalars().all()
+    if with_total is None:
+        with_total = mode == "page"
+    total = await _count_users(db, filters, cached=not username and not real_name and not q) if with_total else None
     
-    count_result = await db.execute(count_stmt)
-    total = count_result.scalar()
+    if mode == "cursor":
+        if cursor:
+            stmt = stmt.where(AdminUser.id < decode_cursor(cursor))
+        
+        # 多取一条判断是否还有下一页
+        result = await db.execute(stmt.limit(size + 1))
+        users = result.all()
+        has_more = len(users) > size
+        users = users[:size]
+        
+        data = {
+            "items": users,
+            "size": size,
+            "next_cursor": encode_cursor(users[-1].id) if has_more else None,
+            "has_more": has_more,
+            "total": total
+        }
+        return typed_response(CursorPageData[UserResponse], data, trace_id=trace_id)
     
-    return success_response(
-        data={
-            "items": [UserResponse.model_validate(u).model_dump() for u in users],
-            "total": total,
-            "page": page,
-            "size": size
-        },
+    # 分页
+    result = await db.execute(stmt.offset((page - 1) * size).limit(size))
+    users = result.all()
+    
+    return typed_response(
+        PageData[UserResponse],
+        {"items": users, "total": total, "page": page, "size": size},
         trace_id=trace_id
     )
 
 
-@router.post("", response_model=dict)
+def _search_filter(db: AsyncSession, keyword: str):
+    """
+    构建关键字搜索条件
+    
+    MySQL 下使用 ngram 全文索引做短语匹配(等价于子串匹配且可走索引);
+    关键字短于 ngram 分词长度或非 MySQL 数据库时退化为 LIKE。
+    
+    Args:
+        db: 数据库会话
+        keyword: 搜索关键字
+        
+    Returns:
+        查询条件
+    """
+    phrase = keyword.replace('"', "")
+    if db.get_bind().dialect.name == "mysql" and len(phrase) >= settings.USER_SEARCH_NGRAM_SIZE:
+        return match(
+            AdminUser.username,
+            AdminUser.real_name,
+            against=f'"{phrase}"'
+        ).in_boolean_mode()
+    
+    pattern = f"%{keyword}%"
+    return or_(AdminUser.username.like(pattern), AdminUser.real_name.like(pattern))
+
+
+async def _count_users(db: AsyncSession, filters: list, cached: bool) -> int:
+    """
+    统计用户总数
+    
+    Args:
+        db: 数据库会话
+        filters: 查询条件
+        cached: 是否使用缓存(仅无筛选条件时使用,缓存 USER_COUNT_CACHE_TTL 秒)
+        
+    Returns:
+        int: 用户总数
+    """
+    if cached:
+        cached_total = await redis_client.get(USER_COUNT_CACHE_KEY)
+        if cached_total is not None:
+            return int(cached_total)
+    
+    count_result = await db.execute(select(func.count(AdminUser.id)).where(*filters))
+    total = count_result.scalar()
+    
+    if cached:
+        await redis_client.setex(USER_COUNT_CACHE_KEY, settings.USER_COUNT_CACHE_TTL, str(total))
+    return total
+
+
+async def _invalidate_user_count() -> None:
+    """清除用户总数缓存(创建/删除用户提交后执行)"""
+    await redis_client.delete(USER_COUNT_CACHE_KEY)
+
+
+@router.post("", response_model=ResponseModel[UserResponse])
 async def create_user(
     request: Request,
     user_data: UserCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:user:create"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:user:create"))
 ):
     """创建用户"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -83,53 +172,56 @@ async def create_user(
     # 创建用户
     user = AdminUser(
         username=user_data.username,
-        password_hash=pwd_context.hash(user_data.password),
+        password_hash=await hash_password(user_data.password),
         real_name=user_data.real_name,
         phone=user_data.phone,
         email=user_data.email,
         status=user_data.status
     )
     db.add(user)
-    await db.commit()
+    await db.flush()
     await db.refresh(user)
+    after_commit(db, _invalidate_user_count)
     
-    return success_response(
-        data=UserResponse.model_validate(user).model_dump(),
+    return typed_response(
+        UserResponse,
+        user,
         message="创建成功",
         trace_id=trace_id
     )
 
 
-@router.get("/{id}", response_model=dict)
+@router.get("/{id}", response_model=ResponseModel[UserResponse])
 async def get_user(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:user:detail"))
+    db: ReadDB,
+    current_user: Principal = Depends(require_perm("sys:user:detail"))
 ):
     """获取用户详情"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminUser).where(AdminUser.id == id, AdminUser.deleted_at.is_(None))
+    stmt = select(*load_columns(AdminUser, UserResponse)).where(AdminUser.id == id, AdminUser.deleted_at.is_(None))
     result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = result.one_or_none()
     
     if not user:
         raise NotFoundException("用户不存在")
     
-    return success_response(
-        data=UserResponse.model_validate(user).model_dump(),
+    return typed_response(
+        UserResponse,
+        user,
         trace_id=trace_id
     )
 
 
-@router.put("/{id}", response_model=dict)
+@router.put("/{id}", response_model=ResponseModel[UserResponse])
 async def update_user(
     request: Request,
     id: int,
     user_data: UserUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:user:update"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:user:update"))
 ):
     """更新用户"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -146,11 +238,16 @@ async def update_user(
     for key, value in update_data.items():
         setattr(user, key, value)
     
-    await db.commit()
+    await db.flush()
     await db.refresh(user)
     
-    return success_response(
-        data=UserResponse.model_validate(user).model_dump(),
+    # 用户状态变更需要刷新登录主体快照
+    if "status" in update_data:
+        after_commit(db, PermissionService.invalidate_snapshots)
+    
+    return typed_response(
+        UserResponse,
+        user,
         message="更新成功",
         trace_id=trace_id
     )
@@ -160,8 +257,8 @@ async def update_user(
 async def delete_user(
     request: Request,
     id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:user:delete"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:user:delete"))
 ):
     """删除用户(软删除)"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -179,7 +276,8 @@ async def delete_user(
     # 软删除
     from datetime import datetime
     user.deleted_at = datetime.now()
-    await db.commit()
+    after_commit(db, PermissionService.invalidate_snapshots)
+    after_commit(db, _invalidate_user_count)
     
     return success_response(message="删除成功", trace_id=trace_id)
 
@@ -189,8 +287,8 @@ async def reset_password(
     request: Request,
     id: int,
     reset_data: ResetPasswordRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:user:reset"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:user:reset"))
 ):
     """重置密码"""
     trace_id = getattr(request.state, "trace_id", "")
@@ -202,8 +300,7 @@ async def reset_password(
     if not user:
         raise NotFoundException("用户不存在")
     
-    user.password_hash = pwd_context.hash(reset_data.password)
-    await db.commit()
+    user.password_hash = await hash_password(reset_data.password)
     
     return success_response(message="密码重置成功", trace_id=trace_id)
 
@@ -213,13 +310,13 @@ async def assign_roles(
     request: Request,
     id: int,
     assign_data: AssignRolesRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: AdminUser = Depends(require_perm("sys:user:assign:role"))
+    db: WriteDB,
+    current_user: Principal = Depends(require_perm("sys:user:assign:role"))
 ):
     """分配角色"""
     trace_id = getattr(request.state, "trace_id", "")
     
-    stmt = select(AdminUser).where(AdminUser.id == id, AdminUser.deleted_at.is_(None))
+    stmt = select(AdminUser).options(*load_profile(AdminUser, "roles")).where(AdminUser.id == id, AdminUser.deleted_at.is_(None))
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
     
@@ -233,6 +330,6 @@ async def assign_roles(
     
     # 分配角色
     user.roles = list(roles)
-    await db.commit()
+    after_commit(db, PermissionService.invalidate_snapshots)
     
     return success_response(message="角色分配成功", trace_id=trace_id)
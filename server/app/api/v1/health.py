@@ -1,10 +1,9 @@
 """
 健康检查路由
 """
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Request
 from sqlalchemy import text
-from app.db.session import get_db
+from app.db.session import PrimaryReadDB, replica_router
 from app.db.redis import redis_client
 from app.schemas.response import success_response
 
@@ -14,12 +13,13 @@ router = APIRouter()
 @router.get("/health")
 async def health_check(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: PrimaryReadDB
 ):
     """
     健康检查接口
     
-    检查服务状态、数据库连接和 Redis 连接
+    检查服务状态、主库连接、Redis 连接和只读副本整体状态;
+    接口无需认证,只返回状态字段,详细指标见 /api/v1/admin/system/db-pool
     
     Returns:
         dict: 健康检查结果
@@ -46,5 +46,7 @@ async def health_check(
         "database": database_status,
         "redis": redis_status
     }
+    if replica_router.replicas:
+        data["replicas"] = "healthy" if replica_router.all_healthy else "degraded"
     
     return success_response(data=data, trace_id=trace_id)
@@ -2,24 +2,29 @@
 小程序认证路由
 """
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db.session import get_db
+from app.db.session import WriteDB
 from app.models.mp_user import MiniProgramUser
 from app.schemas.mp_user import LoginByCodeRequest, LoginResponse, BindPhoneRequest, BindPhoneResponse
 from app.schemas.response import success_response
 from app.utils.wechat import wechat_mp
+from app.core.config import settings
 from app.core.dependencies import get_current_mp_user
+from app.utils.rate_limit import ip_login_limit
 
 router = APIRouter()
 
 
-@router.post("/login_by_code", response_model=dict)
+@router.post(
+    "/login_by_code",
+    response_model=dict,
+    dependencies=[Depends(ip_login_limit("mp", settings.MP_LOGIN_MAX_ATTEMPTS, settings.MP_LOGIN_LIMIT_WINDOW))]
+)
 async def login_by_code(
     request: Request,
     login_data: LoginByCodeRequest,
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB
 ):
     """
     通过微信 code 登录
@@ -62,11 +67,11 @@ async def login_by_code(
         if unionid:
             user.unionid = unionid
     
-    await db.commit()
+    await db.flush()
     await db.refresh(user)
     
     # 生成 JWT token
-    from app.utils.jwt import create_access_token, create_refresh_token
+    from app.core.security import create_access_token, create_refresh_token
     access_token = create_access_token({"sub": str(user.id), "username": user.openid, "role": "mp"})
     refresh_token = create_refresh_token({"sub": str(user.id), "username": user.openid, "role": "mp"})
     
@@ -89,8 +94,8 @@ async def login_by_code(
 async def bind_phone(
     request: Request,
     bind_data: BindPhoneRequest,
-    current_user: MiniProgramUser = Depends(get_current_mp_user),
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB,
+    current_user: MiniProgramUser = Depends(get_current_mp_user)
 ):
     """
     绑定手机号
@@ -110,9 +115,9 @@ async def bind_phone(
     phone_info = await wechat_mp.get_phone_number(bind_data.code)
     phone_number = phone_info.get("phoneNumber") or phone_info.get("purePhoneNumber")
     
-    # 更新用户手机号
-    current_user.phone = phone_number
-    await db.commit()
+    # 更新用户手机号(当前用户由只读会话加载,合并到写会话后再修改)
+    user = await db.merge(current_user, load=False)
+    user.phone = phone_number
     
     return success_response(
         data={"phone": phone_number},
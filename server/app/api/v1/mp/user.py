@@ -2,9 +2,8 @@
 小程序用户路由
 """
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import WriteDB
 from app.models.mp_user import MiniProgramUser
 from app.schemas.mp_user import MiniProgramUserInfo, UpdateUserInfoRequest
 from app.schemas.response import success_response
@@ -42,8 +41,8 @@ async def get_current_user_info(
 async def update_current_user_info(
     request: Request,
     update_data: UpdateUserInfoRequest,
-    current_user: MiniProgramUser = Depends(get_current_mp_user),
-    db: AsyncSession = Depends(get_db)
+    db: WriteDB,
+    current_user: MiniProgramUser = Depends(get_current_mp_user)
 ):
     """
     更新当前用户信息
@@ -59,16 +58,17 @@ async def update_current_user_info(
     """
     trace_id = getattr(request.state, "trace_id", "")
     
-    # 更新用户信息
+    # 更新用户信息(当前用户由只读会话加载,合并到写会话后再修改)
+    user = await db.merge(current_user, load=False)
     if update_data.nickname is not None:
-        current_user.nickname = update_data.nickname
+        user.nickname = update_data.nickname
     if update_data.avatar is not None:
-        current_user.avatar = update_data.avatar
+        user.avatar = update_data.avatar
     
-    await db.commit()
-    await db.refresh(current_user)
+    await db.flush()
+    await db.refresh(user)
     
-    user_info = MiniProgramUserInfo.model_validate(current_user)
+    user_info = MiniProgramUserInfo.model_validate(user)
     
     return success_response(
         data=user_info.model_dump(),
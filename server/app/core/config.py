@@ -28,11 +28,31 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
     
+    # 连接池配置(回收时间需小于 MySQL wait_timeout;借出等待超过 TIMEOUT 秒报错)
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    # 连接空闲超过该秒数才在借出前 ping(0 表示每次借出都 ping,负数表示不 ping)
+    DATABASE_POOL_PING_IDLE: float = 30.0
+    
+    # 只读副本配置(逗号分隔的连接 URL,留空时读请求走主库;复制延迟超过 MAX_LAG 秒的副本暂时摘除)
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_REPLICA_MAX_LAG: float = 5.0
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 10.0
+    
+    @property
+    def database_replica_urls_list(self) -> List[str]:
+        """返回只读副本连接 URL 列表"""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
     # Redis 配置
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: str = ""
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
     
     @property
     def REDIS_URL(self) -> str:
@@ -50,6 +70,53 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # 非对称算法(ES256 / EdDSA / RS256)的 PEM 私钥与公钥路径
+    JWT_PRIVATE_KEY_PATH: str = ""
+    JWT_PUBLIC_KEY_PATH: str = ""
+    
+    # JWT 签名实现(jose / pyjwt,后者需安装 PyJWT,EdDSA 只能使用 pyjwt)与已验证 Access Token 缓存条目数
+    JWT_BACKEND: str = "jose"
+    JWT_CACHE_SIZE: int = 4096
+    
+    # 登录限流配置(滑动窗口)
+    LOGIN_MAX_ATTEMPTS: int = 5
+    LOGIN_LIMIT_WINDOW: int = 300
+    MP_LOGIN_MAX_ATTEMPTS: int = 20
+    MP_LOGIN_LIMIT_WINDOW: int = 60
+    
+    # 接口限流配置(令牌桶,按登录主体,未登录按 IP)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_LEASE_SIZE: int = 5
+    ADMIN_RATE_LIMIT_RATE: float = 20
+    ADMIN_RATE_LIMIT_BURST: int = 40
+    MP_RATE_LIMIT_RATE: float = 10
+    MP_RATE_LIMIT_BURST: int = 20
+    
+    # 权限快照缓存配置
+    PERMISSION_CACHE_TTL: int = 3600
+    PERMISSION_CACHE_LOCAL_SIZE: int = 4096
+    
+    # 菜单路由缓存配置
+    MENU_CACHE_TTL: int = 3600
+    
+    # 用户总数缓存时间(秒,用户列表无筛选条件时使用)
+    USER_COUNT_CACHE_TTL: int = 60
+    
+    # 用户搜索 ngram 分词长度(需与 MySQL ngram_token_size 一致,更短的关键字使用 LIKE)
+    USER_SEARCH_NGRAM_SIZE: int = 2
+    
+    # 密码哈希配置
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    
+    # 审计日志异步写入配置
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL: float = 1.0
+    AUDIT_OVERFLOW_POLICY: str = "drop"
+    AUDIT_SPILL_PATH: str = "logs/audit_spill.jsonl"
+    
     # CORS 配置(字符串,内部转换为列表)
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
@@ -64,6 +131,11 @@ class Settings(BaseSettings):
     # 微信小程序配置
     WECHAT_APPID: str = ""
     WECHAT_SECRET: str = ""
+    WECHAT_API_BASE_URL: str = "https://api.weixin.qq.com"
+    WECHAT_HTTP_TIMEOUT: float = 5.0
+    WECHAT_HTTP_MAX_CONNECTIONS: int = 20
+    WECHAT_TOKEN_REFRESH_AHEAD: int = 300
+    WECHAT_TOKEN_LOCK_TIMEOUT: int = 10
 
     # 管理员初始化配置
     ADMIN_USERNAME: str = ""
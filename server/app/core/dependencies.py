@@ -1,30 +1,111 @@
 """
 认证依赖
 """
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from jose import JWTError
 
-from app.db.session import get_db
+from app.db.session import get_read_db, get_primary_read_db
 from app.models.user import AdminUser
 from app.models.mp_user import MiniProgramUser
 from app.services.auth_service import AuthService
-from app.utils.jwt import decode_token, verify_token_type
+from app.services.permission_service import PermissionService, PermissionSnapshot
+from app.core.security import decode_token, verify_token_type
 from app.core.exceptions import UnauthorizedException
 
 # HTTP Bearer 认证
 security = HTTPBearer()
 
+# 当前登录主体: 由 JWT 与缓存的权限快照构成,不含 ORM 对象
+Principal = PermissionSnapshot
+
+
+def _decode_admin_access_token(token: str) -> Dict[str, Any]:
+    """
+    解码管理端 Access Token
+    
+    Args:
+        token: JWT Token
+        
+    Returns:
+        Dict[str, Any]: Token 数据
+        
+    Raises:
+        UnauthorizedException: Token 无效、过期或类型错误
+    """
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        raise UnauthorizedException("Token 无效或已过期")
+    
+    # 验证 Token 类型(小程序 Token 不能访问管理端)
+    if not verify_token_type(payload, "access") or payload.get("role") == "mp":
+        raise UnauthorizedException("Token 类型错误")
+    
+    if payload.get("sub") is None:
+        raise UnauthorizedException("Token 无效")
+    
+    return payload
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_primary_read_db)
+) -> Principal:
+    """
+    获取当前登录主体(轻量认证路径)
+    
+    只解析 JWT 并读取缓存的权限快照,缓存命中时不访问数据库。
+    需要完整 AdminUser 对象的接口应使用 get_current_user。
+    
+    Args:
+        credentials: HTTP 认证凭证
+        db: 主库只读会话(仅在快照未命中时使用,重建结果会被缓存,不读副本)
+        
+    Returns:
+        Principal: 当前登录主体
+        
+    Raises:
+        UnauthorizedException: Token 无效或用户不存在
+    """
+    payload = _decode_admin_access_token(credentials.credentials)
+    
+    principal = await PermissionService.get_snapshot(db, int(payload["sub"]))
+    if principal is None:
+        raise UnauthorizedException("用户不存在")
+    
+    # 检查用户状态
+    if principal.status != 1:
+        raise UnauthorizedException("用户已被禁用")
+    
+    return principal
+
+
+async def get_current_session_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Optional[str]:
+    """
+    获取当前 Access Token 所属的登录会话 ID
+    
+    Args:
+        credentials: HTTP 认证凭证
+    
+    Returns:
+        Optional[str]: 会话 ID(旧版本签发的 Token 没有 sid 时为 None)
+    """
+    payload = _decode_admin_access_token(credentials.credentials)
+    return payload.get("sid")
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> AdminUser:
     """
-    获取当前登录用户
+    获取当前登录用户(加载完整的 AdminUser 对象)
     
     Args:
         credentials: HTTP 认证凭证
@@ -36,34 +117,18 @@ async def get_current_user(
     Raises:
         UnauthorizedException: Token 无效或用户不存在
     """
-    token = credentials.credentials
+    payload = _decode_admin_access_token(credentials.credentials)
     
-    try:
-        # 解码 Token
-        payload = decode_token(token)
-        
-        # 验证 Token 类型
-        if not verify_token_type(payload, "access"):
-            raise UnauthorizedException("Token 类型错误")
-        
-        # 获取用户 ID
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise UnauthorizedException("Token 无效")
-        
-        # 查询用户
-        user = await AuthService.get_user_by_id(db, int(user_id))
-        if user is None:
-            raise UnauthorizedException("用户不存在")
-        
-        # 检查用户状态
-        if user.status != 1:
-            raise UnauthorizedException("用户已被禁用")
-        
-        return user
-        
-    except JWTError:
-        raise UnauthorizedException("Token 无效或已过期")
+    # 查询用户
+    user = await AuthService.get_user_by_id(db, int(payload["sub"]))
+    if user is None:
+        raise UnauthorizedException("用户不存在")
+    
+    # 检查用户状态
+    if user.status != 1:
+        raise UnauthorizedException("用户已被禁用")
+    
+    return user
 
 
 async def get_current_active_user(
@@ -88,7 +153,7 @@ async def get_current_active_user(
 
 async def get_current_mp_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> MiniProgramUser:
     """
     获取当前小程序用户
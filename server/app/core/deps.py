@@ -5,7 +5,8 @@ from typing import Optional, Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from jose import JWTError
+from app.db.session import get_read_db
 from app.core.security import decode_token
 
 
@@ -29,9 +30,9 @@ async def get_current_user_id(
         HTTPException: Token无效或过期
     """
     token = credentials.credentials
-    payload = decode_token(token)
-    
-    if payload is None:
+    try:
+        payload = decode_token(token)
+    except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token无效或已过期",
@@ -51,7 +52,7 @@ async def get_current_user_id(
 
 async def get_current_user(
     user_id: int = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取当前用户对象
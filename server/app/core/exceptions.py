@@ -7,6 +7,8 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.schemas.response import ORJSONResponse
+
 
 class APIException(Exception):
     """API 自定义异常基类"""
@@ -58,6 +60,20 @@ class BadRequestException(APIException):
         super().__init__(code=400, message=message, data=data)
 
 
+class TooManyRequestsException(APIException):
+    """请求过于频繁异常(限流)"""
+    
+    def __init__(self, message: str = "Too Many Requests", data: Any = None):
+        super().__init__(code=429, message=message, data=data)
+
+
+class ServiceUnavailableException(APIException):
+    """服务繁忙异常(过载保护)"""
+    
+    def __init__(self, message: str = "Service Unavailable", data: Any = None):
+        super().__init__(code=503, message=message, data=data)
+
+
 async def api_exception_handler(request: Request, exc: APIException) -> JSONResponse:
     """
     API 异常处理器
@@ -71,8 +87,8 @@ async def api_exception_handler(request: Request, exc: APIException) -> JSONResp
     """
     trace_id = getattr(request.state, "trace_id", "")
     
-    return JSONResponse(
-        status_code=exc.code if exc.code < 500 else 500,
+    return ORJSONResponse(
+        status_code=exc.code if exc.code < 500 or exc.code == 503 else 500,
         content={
             "code": exc.code,
             "message": exc.message,
@@ -98,7 +114,7 @@ async def http_exception_handler(
     """
     trace_id = getattr(request.state, "trace_id", "")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "code": exc.status_code,
@@ -134,7 +150,7 @@ async def validation_exception_handler(
             "type": error["type"]
         })
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={
             "code": 400,
@@ -164,7 +180,7 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
     print(f"[ERROR] Exception: {exc}")
     print(traceback.format_exc())
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "code": 500,
@@ -3,8 +3,7 @@
 """
 from typing import List
 from fastapi import Depends
-from app.core.dependencies import get_current_user
-from app.models.user import AdminUser
+from app.core.dependencies import get_current_principal, Principal
 from app.services.permission_service import PermissionService
 from app.core.exceptions import ForbiddenException
 
@@ -22,13 +21,13 @@ def require_perm(permission_code: str):
     Example:
         @router.get("/users")
         async def get_users(
-            current_user: AdminUser = Depends(require_perm("sys:user:list"))
+            current_user: Principal = Depends(require_perm("sys:user:list"))
         ):
             return {"users": []}
     """
     async def permission_checker(
-        current_user: AdminUser = Depends(get_current_user)
-    ) -> AdminUser:
+        current_user: Principal = Depends(get_current_principal)
+    ) -> Principal:
         """检查权限"""
         # 检查是否有指定权限
         if not PermissionService.has_permission(current_user, permission_code):
@@ -52,13 +51,13 @@ def require_any_perm(*permission_codes: str):
     Example:
         @router.get("/users")
         async def get_users(
-            current_user: AdminUser = Depends(require_any_perm("sys:user:list", "sys:user:detail"))
+            current_user: Principal = Depends(require_any_perm("sys:user:list", "sys:user:detail"))
         ):
             return {"users": []}
     """
     async def permission_checker(
-        current_user: AdminUser = Depends(get_current_user)
-    ) -> AdminUser:
+        current_user: Principal = Depends(get_current_principal)
+    ) -> Principal:
         """检查权限"""
         # 检查是否有任意权限
         if not PermissionService.has_any_permission(current_user, list(permission_codes)):
@@ -82,13 +81,13 @@ def require_all_perms(*permission_codes: str):
     Example:
         @router.post("/users")
         async def create_user(
-            current_user: AdminUser = Depends(require_all_perms("sys:user:create", "sys:user:assign:role"))
+            current_user: Principal = Depends(require_all_perms("sys:user:create", "sys:user:assign:role"))
         ):
             return {"message": "创建成功"}
     """
     async def permission_checker(
-        current_user: AdminUser = Depends(get_current_user)
-    ) -> AdminUser:
+        current_user: Principal = Depends(get_current_principal)
+    ) -> Principal:
         """检查权限"""
         # 检查是否有所有权限
         if not PermissionService.has_all_permissions(current_user, list(permission_codes)):
@@ -109,15 +108,15 @@ def require_super_admin():
     Example:
         @router.delete("/system/reset")
         async def reset_system(
-            current_user: AdminUser = Depends(require_super_admin())
+            current_user: Principal = Depends(require_super_admin())
         ):
             return {"message": "系统重置成功"}
     """
     async def super_admin_checker(
-        current_user: AdminUser = Depends(get_current_user)
-    ) -> AdminUser:
+        current_user: Principal = Depends(get_current_principal)
+    ) -> Principal:
         """检查是否为超级管理员"""
-        if not PermissionService.is_super_admin(current_user):
+        if not current_user.is_super_admin:
             raise ForbiddenException("需要超级管理员权限")
         
         return current_user
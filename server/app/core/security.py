@@ -1,95 +1,604 @@
 """
-安全相关工具：JWT、密码加密
+加密服务
+
+统一管理 JWT 密钥与签名算法、Token 签发与验签、已验证 Token 缓存以及密码哈希线程池,
+所有认证相关的热路径都经过同一个实现。
+
+- 对称算法(HS256 等)使用 SECRET_KEY 签名和验签;非对称算法(ES256 / EdDSA / RS256)
+  使用 JWT_PRIVATE_KEY_PATH 签名、JWT_PUBLIC_KEY_PATH 验签,公钥通过
+  /.well-known/jwks.json 发布,网关或边缘节点无需共享密钥即可验签
+- 签名/验签后端(JWT_BACKEND: jose / pyjwt)在启动时选定,两者对外都抛出 jose 的
+  JWTError;EdDSA 只有 pyjwt 支持
+- 已验证的 Access Token 缓存在进程内 LRU 中(按 Token 摘要索引,到期即失效)
+- bcrypt 计算耗时约 100~300ms,统一提交到有界线程池(计算期间释放 GIL),
+  排队任务超过上限时直接拒绝(503)
 """
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import asyncio
+import base64
+import hashlib
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import bcrypt
+from jose import JWTError, jwt as jose_jwt
+
 from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+
+# bcrypt 只使用前 72 字节,超出部分显式截断(bcrypt>=5 不再静默截断)
+BCRYPT_MAX_BYTES = 72
+
+
+# ============================================
+# JWT 后端
+# ============================================
+
+class JoseBackend:
+    """python-jose 后端"""
+    
+    name = "jose"
+    
+    def __init__(self, algorithm: str, signing_key: str, verification_key: str):
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verification_key = verification_key
+    
+    def encode(self, claims: Dict[str, Any], headers: Optional[Dict[str, Any]] = None) -> str:
+        return jose_jwt.encode(claims, self.signing_key, algorithm=self.algorithm, headers=headers)
+    
+    def decode(self, token: str) -> Dict[str, Any]:
+        return jose_jwt.decode(token, self.verification_key, algorithms=[self.algorithm])
 
 
-# 密码加密上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+class PyJWTBackend:
+    """PyJWT 后端(可选依赖,支持 EdDSA)"""
+    
+    name = "pyjwt"
+    
+    def __init__(self, algorithm: str, signing_key: str, verification_key: str):
+        try:
+            import jwt as pyjwt
+        except ImportError:
+            raise RuntimeError("JWT_BACKEND=pyjwt 需要安装 PyJWT: pip install PyJWT")
+        self._jwt = pyjwt
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verification_key = verification_key
+    
+    def encode(self, claims: Dict[str, Any], headers: Optional[Dict[str, Any]] = None) -> str:
+        return self._jwt.encode(claims, self.signing_key, algorithm=self.algorithm, headers=headers)
+    
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self.verification_key, algorithms=[self.algorithm])
+        except self._jwt.PyJWTError as e:
+            raise JWTError(str(e))
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def load_backend(name: str, algorithm: str, signing_key: str, verification_key: str):
     """
-    验证密码
+    按名称创建 JWT 后端
     
     Args:
-        plain_password: 明文密码
-        hashed_password: 哈希密码
-        
+        name: 后端名称(jose / pyjwt)
+        algorithm: 签名算法
+        signing_key: 签名密钥
+        verification_key: 验签密钥
+    
     Returns:
-        bool: 密码是否匹配
+        JoseBackend | PyJWTBackend: JWT 后端
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    if name == "pyjwt":
+        return PyJWTBackend(algorithm, signing_key, verification_key)
+    if name == "jose":
+        if algorithm == "EdDSA":
+            raise RuntimeError("python-jose 不支持 EdDSA,请设置 JWT_BACKEND=pyjwt")
+        return JoseBackend(algorithm, signing_key, verification_key)
+    raise RuntimeError(f"不支持的 JWT_BACKEND: {name}")
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
 
+def _read_key_file(path: str, setting_name: str) -> str:
+    if not path:
+        raise RuntimeError(f"ALGORITHM={settings.ALGORITHM} 需要配置 {setting_name}")
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
 
-def get_password_hash(password: str) -> str:
+
+def build_public_jwk(public_key_pem: str, algorithm: str) -> Dict[str, str]:
     """
-    获取密码哈希
+    将 PEM 公钥转换为 JWK(kid 为公钥 DER 的 SHA-256 摘要前缀)
     
     Args:
-        password: 明文密码
+        public_key_pem: PEM 格式公钥
+        algorithm: 签名算法
+    
+    Returns:
+        Dict[str, str]: JWK
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+    
+    public_key = serialization.load_pem_public_key(public_key_pem.encode())
+    der = public_key.public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    jwk = {"kid": _b64url(hashlib.sha256(der).digest())[:16], "alg": algorithm, "use": "sig"}
+    
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        numbers = public_key.public_numbers()
+        size = (public_key.curve.key_size + 7) // 8
+        jwk.update({
+            "kty": "EC",
+            "crv": {256: "P-256", 384: "P-384", 521: "P-521"}[public_key.curve.key_size],
+            "x": _b64url(numbers.x.to_bytes(size, "big")),
+            "y": _b64url(numbers.y.to_bytes(size, "big"))
+        })
+    elif isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        jwk.update({"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw)})
+    elif isinstance(public_key, rsa.RSAPublicKey):
+        numbers = public_key.public_numbers()
+        jwk.update({
+            "kty": "RSA",
+            "n": _b64url(numbers.n.to_bytes((numbers.n.bit_length() + 7) // 8, "big")),
+            "e": _b64url(numbers.e.to_bytes((numbers.e.bit_length() + 7) // 8, "big"))
+        })
+    else:
+        raise RuntimeError(f"不支持的公钥类型: {type(public_key).__name__}")
+    
+    return jwk
+
+
+# ============================================
+# 已验证 Token 缓存
+# ============================================
+
+class VerifiedTokenCache:
+    """已验证 Token 的进程内 LRU 缓存"""
+    
+    def __init__(self, max_entries: int):
+        """
+        Args:
+            max_entries: 最大条目数(0 表示禁用缓存)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的 Token 数据
+        
+        Args:
+            token: JWT Token
+        
+        Returns:
+            Optional[Dict[str, Any]]: Token 数据副本,未命中或已过期返回 None
+        """
+        if self.max_entries <= 0:
+            return None
+        
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self._misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return dict(payload)
+    
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        """
+        缓存已验证的 Token 数据(有效期为 Token 剩余有效期)
+        
+        Args:
+            token: JWT Token
+            payload: Token 数据
+        """
+        exp = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)):
+            return
+        
+        self._entries[self._digest(token)] = (payload, exp)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存指标
+        
+        Returns:
+            Dict[str, int]: 条目数、上限、命中数、未命中数
+        """
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses
+        }
+
+
+# ============================================
+# 密码哈希线程池
+# ============================================
+
+class PasswordHasherPool:
+    """有界密码哈希线程池"""
+    
+    def __init__(self, max_workers: int, max_queue_size: int):
+        """
+        Args:
+            max_workers: 工作线程数
+            max_queue_size: 等待队列上限(不含正在执行的任务)
+        """
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._peak_queued = 0
+        self._completed = 0
+        self._rejected = 0
+    
+    @property
+    def queued(self) -> int:
+        """当前排队中的任务数"""
+        return max(0, self._in_flight - self.max_workers)
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        在线程池中执行任务
+        
+        Args:
+            func: 同步函数
+            *args: 函数参数
+        
+        Returns:
+            Any: 函数返回值
+        
+        Raises:
+            ServiceUnavailableException: 等待队列已满
+        """
+        if self._in_flight >= self.max_workers + self.max_queue_size:
+            self._rejected += 1
+            raise ServiceUnavailableException("服务繁忙,请稍后重试")
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher"
+            )
+        
+        self._in_flight += 1
+        self._peak_queued = max(self._peak_queued, self.queued)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取线程池指标
+        
+        Returns:
+            Dict[str, int]: 工作线程数、执行中/排队任务数、峰值排队数、完成数、拒绝数
+        """
+        return {
+            "workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "peak_queued": self._peak_queued,
+            "completed": self._completed,
+            "rejected": self._rejected
+        }
+    
+    def shutdown(self) -> None:
+        """关闭线程池(等待执行中的任务完成)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _hash_password_sync(password: str, rounds: int) -> str:
+    password_bytes = password.encode('utf-8')[:BCRYPT_MAX_BYTES]
+    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=rounds))
+    return hashed.decode('utf-8')
+
+
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    password_bytes = plain_password.encode('utf-8')[:BCRYPT_MAX_BYTES]
+    hashed_bytes = hashed_password.encode('utf-8')
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+# ============================================
+# 加密服务
+# ============================================
+
+class CryptoService:
+    """加密服务: 持有密钥、JWT 后端、Token 缓存与密码哈希线程池"""
+    
+    def __init__(self):
+        self.algorithm = settings.ALGORITHM
+        self.public_jwk: Optional[Dict[str, str]] = None
+        
+        if self.algorithm.startswith("HS"):
+            signing_key = verification_key = settings.SECRET_KEY
+        else:
+            signing_key = _read_key_file(settings.JWT_PRIVATE_KEY_PATH, "JWT_PRIVATE_KEY_PATH")
+            verification_key = _read_key_file(settings.JWT_PUBLIC_KEY_PATH, "JWT_PUBLIC_KEY_PATH")
+            self.public_jwk = build_public_jwk(verification_key, self.algorithm)
+        
+        self.backend = load_backend(settings.JWT_BACKEND, self.algorithm, signing_key, verification_key)
+        self._headers = {"kid": self.public_jwk["kid"]} if self.public_jwk else None
+        self.token_cache = VerifiedTokenCache(settings.JWT_CACHE_SIZE)
+        self.password_pool = PasswordHasherPool(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            max_queue_size=settings.PASSWORD_HASH_QUEUE_SIZE
+        )
+    
+    def encode_token(self, claims: Dict[str, Any]) -> str:
+        """
+        签发 JWT
+        
+        Args:
+            claims: Token 数据
+        
+        Returns:
+            str: JWT Token
+        """
+        return self.backend.encode(claims, self._headers)
+    
+    def decode_token(self, token: str) -> Dict[str, Any]:
+        """
+        验签并解码 JWT(Access Token 命中已验证缓存时跳过验签)
+        
+        Args:
+            token: JWT Token
+        
+        Returns:
+            Dict[str, Any]: Token 数据
+        
+        Raises:
+            JWTError: Token 无效或过期
+        """
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            return payload
+        
+        try:
+            payload = self.backend.decode(token)
+        except JWTError as e:
+            raise JWTError(f"Token 解码失败: {str(e)}")
+        
+        # Refresh Token 每次使用后都会轮换,只缓存 Access Token
+        if payload.get("type") == "access":
+            self.token_cache.set(token, dict(payload))
+        return payload
+    
+    def jwks(self) -> Dict[str, Any]:
+        """
+        获取验签公钥集合(对称算法时为空)
+        
+        Returns:
+            Dict[str, Any]: JWKS
+        """
+        return {"keys": [self.public_jwk] if self.public_jwk else []}
+    
+    async def hash_password(self, password: str) -> str:
+        """
+        哈希密码(在密码线程池中执行)
         
+        Args:
+            password: 明文密码
+        
+        Returns:
+            str: 哈希后的密码
+        """
+        return await self.password_pool.run(_hash_password_sync, password, settings.BCRYPT_ROUNDS)
+    
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        验证密码(在密码线程池中执行)
+        
+        Args:
+            plain_password: 明文密码
+            hashed_password: 哈希密码
+        
+        Returns:
+            bool: 密码是否匹配
+        """
+        return await self.password_pool.run(_verify_password_sync, plain_password, hashed_password)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取运行指标
+        
+        Returns:
+            Dict[str, Any]: 签名配置、Token 缓存与密码线程池指标
+        """
+        return {
+            "algorithm": self.algorithm,
+            "backend": self.backend.name,
+            "token_cache": self.token_cache.stats(),
+            "password_pool": self.password_pool.stats()
+        }
+    
+    def shutdown(self) -> None:
+        """释放资源(应用关闭时调用)"""
+        self.password_pool.shutdown()
+
+
+# 全局加密服务实例(启动时加载密钥并选定 JWT 后端)
+crypto = CryptoService()
+
+
+# ============================================
+# 便捷函数
+# ============================================
+
+def generate_jti() -> str:
+    """
+    生成 Token 唯一标识(96 位随机数,16 个字符)
+    
     Returns:
-        str: 哈希密码
+        str: jti
     """
-    return pwd_context.hash(password)
+    return secrets.token_urlsafe(12)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
-    创建访问令牌
+    创建 Access Token
     
     Args:
-        data: 要编码的数据
+        data: Token 数据
         expires_delta: 过期时间增量
-        
+    
     Returns:
         str: JWT Token
     """
-    to_encode = data.copy()
+    now = int(time.time())
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
     
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode = data.copy()
+    to_encode.update({
+        "exp": expire,
+        "iat": now,
+        "type": "access"
+    })
+    
+    return crypto.encode_token(to_encode)
 
 
-def create_refresh_token(data: Dict[str, Any]) -> str:
+def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
-    创建刷新令牌
+    创建 Refresh Token
     
     Args:
-        data: 要编码的数据
-        
+        data: Token 数据(未包含 jti 时自动生成;包含 exp 时沿用,用于轮换时保持会话过期时间)
+        expires_delta: 过期时间增量
+    
     Returns:
-        str: JWT Refresh Token
+        str: JWT Token
     """
+    now = int(time.time())
+    if expires_delta:
+        expire = now + int(expires_delta.total_seconds())
+    else:
+        expire = now + settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode.setdefault("jti", generate_jti())
+    to_encode.setdefault("exp", expire)
+    to_encode.update({
+        "iat": now,
+        "type": "refresh"
+    })
+    
+    return crypto.encode_token(to_encode)
 
 
-def decode_token(token: str) -> Optional[Dict[str, Any]]:
+def decode_token(token: str) -> Dict[str, Any]:
     """
-    解码令牌
+    解码 Token
     
     Args:
         token: JWT Token
-        
+    
     Returns:
-        Optional[Dict[str, Any]]: 解码后的数据，失败返回 None
+        Dict[str, Any]: Token 数据
+    
+    Raises:
+        JWTError: Token 无效或过期
+    """
+    return crypto.decode_token(token)
+
+
+def verify_token_type(payload: Dict[str, Any], expected_type: str) -> bool:
+    """
+    验证 Token 类型
+    
+    Args:
+        payload: Token 数据
+        expected_type: 期望的 Token 类型(access/refresh)
+    
+    Returns:
+        bool: 类型是否匹配
+    """
+    token_type = payload.get("type")
+    return token_type == expected_type
+
+
+async def hash_password(password: str) -> str:
+    """
+    哈希密码
+    
+    Args:
+        password: 明文密码
+    
+    Returns:
+        str: 哈希后的密码
+    """
+    return await crypto.hash_password(password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    验证密码
+    
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希密码
+    
+    Returns:
+        bool: 密码是否匹配
+    """
+    return await crypto.verify_password(plain_password, hashed_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    判断哈希的计算成本是否与当前配置不一致(需要在登录时重新哈希)
+    
+    Args:
+        hashed_password: 哈希密码(格式: $2b$12$...)
+    
+    Returns:
+        bool: 是否需要重新哈希
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.BCRYPT_ROUNDS
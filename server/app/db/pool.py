@@ -0,0 +1,160 @@
+"""
+数据库连接池监控
+"""
+import bisect
+import time
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# 借出等待耗时直方图的桶上界(毫秒)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """连接池指标"""
+    
+    def __init__(self):
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.ping_failures = 0
+    
+    def observe_wait(self, elapsed_ms: float) -> None:
+        """记录一次借出等待耗时"""
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, elapsed_ms)] += 1
+        self.wait_count += 1
+        self.wait_sum_ms += elapsed_ms
+        self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        导出指标
+        
+        Returns:
+            Dict[str, Any]: 计数器与借出等待直方图(累计计数,le 为桶上界)
+        """
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*WAIT_BUCKETS_MS, "+Inf"), self.wait_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        
+        return {
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "timeouts": self.timeouts,
+            "wait_ms": {
+                "count": self.wait_count,
+                "sum": round(self.wait_sum_ms, 3),
+                "max": round(self.wait_max_ms, 3),
+                "buckets": buckets
+            }
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    记录借出等待耗时的连接池
+    
+    等待时间包含排队等待空闲连接与新建连接的耗时,
+    可据此判断延迟尖刺是否来自连接池耗尽。
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+    
+    def recreate(self) -> "InstrumentedQueuePool":
+        # engine.dispose() 会重建连接池,指标延续到新池
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.observe_wait((time.perf_counter() - start) * 1000)
+
+
+def instrument_engine(engine: AsyncEngine, ping_idle: float) -> None:
+    """
+    注册连接池事件: 统计建连与失效次数,并按空闲时间决定借出前是否 ping
+    
+    替代 pool_pre_ping(每次借出都 ping 一次): 连接空闲未超过 ping_idle 秒时
+    直接使用,超过时才 ping,失败则丢弃该连接并由连接池重新获取。
+    
+    Args:
+        engine: 使用 InstrumentedQueuePool 的异步引擎
+        ping_idle: 空闲多少秒后借出前 ping(0 表示每次借出都 ping,负数表示不 ping)
+    """
+    sync_engine = engine.sync_engine
+    
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        sync_engine.pool.metrics.connects += 1
+    
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+    
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        sync_engine.pool.metrics.invalidations += 1
+    
+    if ping_idle < 0:
+        return
+    
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        # 新建的连接没有归还时间,无需 ping
+        checked_in_at = connection_record.info.pop("checked_in_at", None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < ping_idle:
+            return
+        
+        metrics = sync_engine.pool.metrics
+        metrics.pings += 1
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            metrics.ping_failures += 1
+            raise DisconnectionError(f"连接空闲后 ping 失败: {e}") from e
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    获取引擎连接池状态
+    
+    Args:
+        engine: 异步引擎
+    
+    Returns:
+        Dict[str, Any]: 连接池容量、当前借出/溢出连接数与累计指标
+    """
+    pool = engine.sync_engine.pool
+    status = {
+        "url": engine.url.render_as_string(hide_password=True),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "timeout": pool.timeout()
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
@@ -1,8 +1,15 @@
 """
 Redis 连接管理
+
+全局唯一的 Redis 客户端,连接池在应用 lifespan 中创建并显式配置
+最大连接数、超时和健康检查间隔;多键操作通过 pipeline()/transaction()
+合并为一次网络往返。
 """
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
 from app.core.config import settings
 
 
@@ -10,21 +17,83 @@ class RedisClient:
     """Redis 客户端"""
     
     def __init__(self):
+        self.pool: Optional[aioredis.ConnectionPool] = None
         self.redis: Optional[aioredis.Redis] = None
+        self._scripts: Dict[str, AsyncScript] = {}
     
     async def connect(self):
-        """连接 Redis"""
-        self.redis = await aioredis.from_url(
-            f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}",
-            password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
+        """创建连接池并连接 Redis(应用启动时调用)"""
+        self.pool = aioredis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
             encoding="utf-8",
             decode_responses=True
         )
+        self.redis = aioredis.Redis(connection_pool=self.pool)
+        self._scripts = {}
     
     async def close(self):
         """关闭连接"""
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
+            self.redis = None
+        if self.pool:
+            await self.pool.aclose()
+            self.pool = None
+    
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[Pipeline]:
+        """
+        非事务管道: 命令在 execute() 时一次性发送
+        
+        Usage:
+            async with redis_client.pipeline() as pipe:
+                pipe.get("a")
+                pipe.get("b")
+                a, b = await pipe.execute()
+        """
+        if self.redis is None:
+            raise RuntimeError("Redis 未连接")
+        async with self.redis.pipeline(transaction=False) as pipe:
+            yield pipe
+    
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Pipeline]:
+        """
+        事务管道: 命令包裹在 MULTI/EXEC 中原子执行,用法同 pipeline()
+        """
+        if self.redis is None:
+            raise RuntimeError("Redis 未连接")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            yield pipe
+    
+    async def run_script(self, source: str, keys: List[str], args: List[Any]) -> Any:
+        """
+        执行 Lua 脚本(EVALSHA,服务端未缓存时自动 SCRIPT LOAD 后重试)
+        
+        Args:
+            source: Lua 脚本源码
+            keys: KEYS 参数
+            args: ARGV 参数
+        
+        Returns:
+            Any: 脚本返回值,未连接时返回 None
+        """
+        if self.redis is None:
+            return None
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self.redis.register_script(source)
+        return await script(keys=keys, args=args)
+    
+    async def ping(self) -> bool:
+        """检查连接"""
+        if self.redis is None:
+            raise RuntimeError("Redis 未连接")
+        return await self.redis.ping()
     
     async def get(self, key: str) -> Optional[str]:
         """获取值"""
@@ -42,11 +111,51 @@ class RedisClient:
         if self.redis:
             await self.redis.setex(key, seconds, value)
     
-    async def delete(self, key: str):
-        """删除键"""
+    async def set_nx(self, key: str, value: str, expire: int) -> bool:
+        """键不存在时设置值并指定过期时间(秒),返回是否设置成功"""
         if self.redis:
-            await self.redis.delete(key)
-
+            return bool(await self.redis.set(key, value, ex=expire, nx=True))
+        return False
+    
+    async def ttl(self, key: str) -> int:
+        """获取剩余过期时间(秒),未连接或键不存在时返回负数"""
+        if self.redis:
+            return await self.redis.ttl(key)
+        return -2
+    
+    async def expire(self, key: str, seconds: int):
+        """设置过期时间(秒)"""
+        if self.redis:
+            await self.redis.expire(key, seconds)
+    
+    async def delete(self, *keys: str):
+        """删除一个或多个键"""
+        if self.redis and keys:
+            await self.redis.delete(*keys)
+    
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        """获取哈希字段值"""
+        if self.redis:
+            return await self.redis.hget(key, field)
+        return None
+    
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        """获取哈希的全部字段"""
+        if self.redis:
+            return await self.redis.hgetall(key)
+        return {}
+    
+    async def hdel(self, key: str, *fields: str) -> int:
+        """删除哈希字段,返回实际删除的数量"""
+        if self.redis and fields:
+            return await self.redis.hdel(key, *fields)
+        return 0
+    
+    async def incr(self, key: str) -> Optional[int]:
+        """自增,未连接时返回 None"""
+        if self.redis:
+            return await self.redis.incr(key)
+        return None
     
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
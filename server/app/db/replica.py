@@ -0,0 +1,163 @@
+"""
+只读副本路由
+"""
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class ReplicaRouter:
+    """
+    只读副本路由
+    
+    后台任务定期检查每个副本的连通性与复制延迟,连接失败、复制中断或
+    延迟超过 max_lag 的副本暂时摘除;读会话在健康副本间轮询,
+    没有可用副本时回退到主库。
+    """
+    
+    def __init__(
+        self,
+        replicas: List[AsyncEngine],
+        primary: AsyncEngine,
+        max_lag: float,
+        check_interval: float
+    ):
+        """
+        Args:
+            replicas: 副本引擎列表
+            primary: 主库只读引擎(回退使用)
+            max_lag: 允许的最大复制延迟(秒)
+            check_interval: 健康检查间隔(秒)
+        """
+        self.replicas = replicas
+        self.primary = primary
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._healthy: List[AsyncEngine] = []
+        self._status: Dict[AsyncEngine, Dict[str, Any]] = {
+            engine: {"healthy": False, "lag": None, "error": "未检查"} for engine in replicas
+        }
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._fallbacks = 0
+    
+    def pick(self) -> AsyncEngine:
+        """
+        选择本次读会话使用的引擎
+        
+        Returns:
+            AsyncEngine: 健康副本(轮询),无可用副本时为主库
+        """
+        healthy = self._healthy
+        if not healthy:
+            if self.replicas:
+                self._fallbacks += 1
+            return self.primary
+        return healthy[next(self._counter) % len(healthy)]
+    
+    def mark_down(self, engine: AsyncEngine, error: str = "") -> None:
+        """
+        摘除请求中连接失败的副本,下次健康检查通过后恢复
+        
+        Args:
+            engine: 副本引擎
+            error: 错误信息
+        """
+        if engine not in self._status:
+            return
+        self._healthy = [e for e in self._healthy if e is not engine]
+        self._status[engine] = {"healthy": False, "lag": None, "error": error or "连接失败"}
+    
+    async def start(self) -> None:
+        """检查一次副本状态并启动后台检查任务(应用启动时调用)"""
+        if self._task is not None or not self.replicas:
+            return
+        await self.check()
+        self._task = asyncio.create_task(self._run(), name="replica-health-check")
+    
+    async def stop(self) -> None:
+        """停止后台检查任务并释放副本连接池(应用关闭时调用)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        for engine in self.replicas:
+            await engine.dispose()
+    
+    async def check(self) -> None:
+        """并发检查所有副本并更新可用列表"""
+        results = await asyncio.gather(
+            *(self._check_one(engine) for engine in self.replicas)
+        )
+        self._status = dict(zip(self.replicas, results))
+        self._healthy = [engine for engine in self.replicas if self._status[engine]["healthy"]]
+    
+    @property
+    def all_healthy(self) -> bool:
+        """所有副本当前均可用(未配置副本时为 True)"""
+        return len(self._healthy) == len(self.replicas)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取副本路由指标
+        
+        Returns:
+            Dict[str, Any]: 各副本的健康状态与延迟、回退主库次数
+        """
+        return {
+            "replicas": [
+                {"url": engine.url.render_as_string(hide_password=True), **self._status[engine]}
+                for engine in self.replicas
+            ],
+            "healthy": len(self._healthy),
+            "fallbacks": self._fallbacks
+        }
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+    
+    async def _check_one(self, engine: AsyncEngine) -> Dict[str, Any]:
+        try:
+            lag = await asyncio.wait_for(self._replication_lag(engine), timeout=self.check_interval)
+        except Exception as e:
+            return {"healthy": False, "lag": None, "error": str(getattr(e, "orig", None) or e) or type(e).__name__}
+        
+        if lag is None:
+            return {"healthy": False, "lag": None, "error": "复制已中断"}
+        if lag > self.max_lag:
+            return {"healthy": False, "lag": lag, "error": f"复制延迟超过 {self.max_lag} 秒"}
+        return {"healthy": True, "lag": lag, "error": None}
+    
+    @staticmethod
+    async def _replication_lag(engine: AsyncEngine) -> Optional[float]:
+        """
+        查询副本复制延迟
+        
+        Returns:
+            Optional[float]: 延迟秒数;复制中断时为 None;非复制节点视为 0
+        """
+        async with engine.connect() as conn:
+            if conn.dialect.name != "mysql":
+                await conn.execute(text("SELECT 1"))
+                return 0.0
+            
+            # MySQL 8.0.22+ 使用 SHOW REPLICA STATUS,旧版本回退到 SHOW SLAVE STATUS
+            try:
+                result = await conn.execute(text("SHOW REPLICA STATUS"))
+            except DBAPIError:
+                result = await conn.execute(text("SHOW SLAVE STATUS"))
+            row = result.mappings().first()
+            if row is None:
+                return 0.0
+            
+            lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+            return None if lag is None else float(lag)
@@ -1,21 +1,82 @@
 """
 数据库会话管理
 """
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Annotated, Any, AsyncGenerator, Awaitable, Callable, Dict
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool, instrument_engine, pool_status
+from app.db.replica import ReplicaRouter
+
+
+def _pool_options() -> Dict[str, Any]:
+    """连接池参数(主库与每个副本各一个连接池)"""
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT
+    }
+
+
+def _set_read_only(dbapi_connection, connection_record):
+    """MySQL 只读连接在建立时设置为只读,误写入会直接报错"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SET SESSION TRANSACTION READ ONLY")
+    cursor.close()
+
+
+def create_read_engine(url: str) -> AsyncEngine:
+    """
+    创建只读引擎
+    
+    连接固定为 autocommit,查询不开启事务,结束时既不 COMMIT 也不 ROLLBACK。
+    
+    Args:
+        url: 数据库连接 URL
+        
+    Returns:
+        AsyncEngine: 只读引擎
+    """
+    read_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        isolation_level="AUTOCOMMIT",
+        skip_autocommit_rollback=True,
+        **_pool_options()
+    )
+    instrument_engine(read_engine, settings.DATABASE_POOL_PING_IDLE)
+    if read_engine.dialect.name == "mysql":
+        event.listen(read_engine.sync_engine, "connect", _set_read_only)
+    return read_engine
 
 
 # 创建异步引擎
+# skip_autocommit_rollback: 连接处于 autocommit 时归还连接池不再发送 ROLLBACK
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    skip_autocommit_rollback=True,
+    **_pool_options()
+)
+instrument_engine(engine, settings.DATABASE_POOL_PING_IDLE)
+
+# 主库只读引擎(未配置副本或副本全部不可用时承接读请求)
+read_engine = create_read_engine(settings.DATABASE_URL)
+
+# 只读副本路由
+replica_router = ReplicaRouter(
+    [create_read_engine(url) for url in settings.database_replica_urls_list],
+    primary=read_engine,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL
 )
 
+
 # 创建会话工厂
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -25,13 +86,86 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+# 只读会话工厂
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    获取所有引擎的连接池状态
+    
+    Returns:
+        Dict[str, Any]: 主库写引擎、主库只读引擎与各副本的连接池状态
+    """
+    return {
+        "primary": pool_status(engine),
+        "primary_read": pool_status(read_engine),
+        "replicas": [pool_status(replica) for replica in replica_router.replicas]
+    }
+
+
 # 声明基类
 Base = declarative_base()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    注册提交成功后执行的回调(如缓存失效)
+    
+    回调只在 get_write_db 提交成功后执行,回滚时丢弃。
+    
+    Args:
+        session: 写会话
+        callback: 无参异步函数
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    获取数据库会话
+    获取只读数据库会话
+    
+    使用 autocommit 连接,请求结束时不提交也不回滚,省去一次数据库往返;
+    配置了只读副本时在健康副本间轮询,副本连接失败时立即摘除。
+    
+    Yields:
+        AsyncSession: 只读数据库会话
+    """
+    bind = replica_router.pick()
+    async with ReadSessionLocal(bind=bind) as session:
+        try:
+            yield session
+        except OperationalError as e:
+            replica_router.mark_down(bind, str(e.orig))
+            raise
+
+
+async def get_primary_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取主库只读会话(不经过副本)
+    
+    用于重建跨请求缓存的读取(权限快照、菜单路由、权限目录): 缓存失效发生在
+    主库提交之后,此时落后的副本仍可能返回旧数据,而缓存会把旧数据以新版本号
+    保存到下一次失效为止,远超复制延迟本身。
+    
+    Yields:
+        AsyncSession: 主库只读数据库会话
+    """
+    async with ReadSessionLocal(bind=replica_router.primary) as session:
+        yield session
+
+
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取写数据库会话
+    
+    请求处理函数与服务层只 flush,由此处统一提交一次;
+    异常时回滚,提交成功后逐个执行 after_commit 注册的回调(单个回调失败不中断)。
+    需以 scope="function" 依赖(见 WriteDB),保证在响应发送前完成提交。
     
     Yields:
         AsyncSession: 数据库会话
@@ -43,5 +177,15 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
+        # 数据已提交,回调失败(如 Redis 不可用)只记录日志,不影响响应与其余回调
+        for callback in session.info.pop("after_commit", []):
+            try:
+                await callback()
+            except Exception as e:
+                print(f"提交后回调 {getattr(callback, '__qualname__', callback)} 执行失败: {e}")
+
+
+# 路由依赖类型
+ReadDB = Annotated[AsyncSession, Depends(get_read_db)]
+PrimaryReadDB = Annotated[AsyncSession, Depends(get_primary_read_db)]
+WriteDB = Annotated[AsyncSession, Depends(get_write_db, scope="function")]
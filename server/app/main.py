@@ -2,13 +2,18 @@
 FastAPI 应用入口
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.config import settings
 from app.db.redis import redis_client
+from app.db.session import replica_router
+from app.core.security import crypto
+from app.utils.wechat import wechat_mp
+from app.utils.audit import audit_writer
+from app.utils.rate_limit import rate_limit, principal_key
 from app.core.exceptions import (
     APIException,
     api_exception_handler,
@@ -17,6 +22,7 @@ from app.core.exceptions import (
     general_exception_handler
 )
 from app.middleware.trace_id import TraceIDMiddleware
+from app.schemas.response import ORJSONResponse
 from app.api.v1 import health
 
 
@@ -26,12 +32,20 @@ async def lifespan(app: FastAPI):
     # 启动时执行
     await redis_client.connect()
     print("✅ Redis 连接成功")
+    await wechat_mp.start()
+    await audit_writer.start()
+    await replica_router.start()
     
     yield
     
     # 关闭时执行
+    await replica_router.stop()
+    await audit_writer.stop()
+    await wechat_mp.close()
     await redis_client.close()
     print("✅ Redis 连接已关闭")
+    
+    crypto.shutdown()
 
 
 # 创建 FastAPI 应用
@@ -40,6 +54,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     debug=settings.DEBUG,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json"
@@ -52,6 +67,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 前端跨域读取 ETag 做协商缓存(权限目录)
+    expose_headers=["ETag"],
 )
 
 # 添加 Trace ID 中间件
@@ -75,23 +92,42 @@ async def root():
     }
 
 
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """JWT 验签公钥(非对称算法时供网关/边缘节点验签)"""
+    return crypto.jwks()
+
+
 # 注册路由
 app.include_router(health.router, prefix="/api/v1", tags=["健康检查"])
 
+# 接口限流(在访问数据库前拒绝超额请求)
+admin_dependencies = []
+mp_dependencies = []
+if settings.RATE_LIMIT_ENABLED:
+    admin_dependencies.append(Depends(rate_limit(
+        principal_key, settings.ADMIN_RATE_LIMIT_RATE, settings.ADMIN_RATE_LIMIT_BURST, scope="admin"
+    )))
+    mp_dependencies.append(Depends(rate_limit(
+        principal_key, settings.MP_RATE_LIMIT_RATE, settings.MP_RATE_LIMIT_BURST, scope="mp"
+    )))
+
 # 管理端路由
 from app.api.v1.admin import auth as admin_auth, demo as admin_demo, menu as admin_menu
 from app.api.v1.admin import user as admin_user, role as admin_role, permission as admin_permission
-app.include_router(admin_auth.router, prefix="/api/v1/admin/auth", tags=["管理端-认证"])
-app.include_router(admin_demo.router, prefix="/api/v1/admin/demo", tags=["管理端-示例"])
-app.include_router(admin_menu.router, prefix="/api/v1/admin/menus", tags=["管理端-菜单"])
-app.include_router(admin_user.router, prefix="/api/v1/admin/users", tags=["管理端-用户"])
-app.include_router(admin_role.router, prefix="/api/v1/admin/roles", tags=["管理端-角色"])
-app.include_router(admin_permission.router, prefix="/api/v1/admin/permissions", tags=["管理端-权限"])
+from app.api.v1.admin import system as admin_system
+app.include_router(admin_auth.router, prefix="/api/v1/admin/auth", tags=["管理端-认证"], dependencies=admin_dependencies)
+app.include_router(admin_demo.router, prefix="/api/v1/admin/demo", tags=["管理端-示例"], dependencies=admin_dependencies)
+app.include_router(admin_menu.router, prefix="/api/v1/admin/menus", tags=["管理端-菜单"], dependencies=admin_dependencies)
+app.include_router(admin_user.router, prefix="/api/v1/admin/users", tags=["管理端-用户"], dependencies=admin_dependencies)
+app.include_router(admin_role.router, prefix="/api/v1/admin/roles", tags=["管理端-角色"], dependencies=admin_dependencies)
+app.include_router(admin_permission.router, prefix="/api/v1/admin/permissions", tags=["管理端-权限"], dependencies=admin_dependencies)
+app.include_router(admin_system.router, prefix="/api/v1/admin/system", tags=["管理端-系统"], dependencies=admin_dependencies)
 
 # 小程序路由
 from app.api.v1.mp import auth as mp_auth, user as mp_user
-app.include_router(mp_auth.router, prefix="/api/v1/mp/auth", tags=["小程序-认证"])
-app.include_router(mp_user.router, prefix="/api/v1/mp/user", tags=["小程序-用户"])
+app.include_router(mp_auth.router, prefix="/api/v1/mp/auth", tags=["小程序-认证"], dependencies=mp_dependencies)
+app.include_router(mp_user.router, prefix="/api/v1/mp/user", tags=["小程序-用户"], dependencies=mp_dependencies)
 
 
 if __name__ == "__main__":
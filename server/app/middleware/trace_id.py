@@ -2,45 +2,68 @@
 Trace ID 中间件
 """
 import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from contextvars import ContextVar
 
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-class TraceIDMiddleware(BaseHTTPMiddleware):
+# 当前请求的 trace_id(供日志等无法拿到 request 的地方使用)
+trace_id_var: ContextVar[str] = ContextVar("trace_id", default="")
+
+
+def get_trace_id() -> str:
+    """获取当前请求的 trace_id,不在请求上下文中时返回空字符串"""
+    return trace_id_var.get()
+
+
+class TraceIDMiddleware:
     """
-    Trace ID 中间件
+    Trace ID 中间件(纯 ASGI 实现)
     
-    为每个请求生成唯一的 trace_id,用于请求追踪和日志关联
+    为每个请求生成唯一的 trace_id,用于请求追踪和日志关联。
+    trace_id 写入 request.state、contextvar 和响应头;不使用 BaseHTTPMiddleware,
+    避免 call_next 额外的任务与内存流开销,也不影响流式响应。
     """
     
-    def __init__(self, app, header_name: str = "X-Trace-ID"):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, header_name: str = "X-Trace-ID"):
+        self.app = app
         self.header_name = header_name
+        self._header_key = header_name.lower().encode("latin-1")
     
-    async def dispatch(self, request: Request, call_next) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         处理请求
         
         Args:
-            request: 请求对象
-            call_next: 下一个中间件或路由处理器
-            
-        Returns:
-            Response: 响应对象
+            scope: ASGI scope
+            receive: ASGI receive
+            send: ASGI send
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # 从请求头获取 trace_id,如果没有则生成新的
-        trace_id = request.headers.get(self.header_name)
+        trace_id = ""
+        for key, value in scope["headers"]:
+            if key == self._header_key:
+                trace_id = value.decode("latin-1")
+                break
         if not trace_id:
             trace_id = str(uuid.uuid4())
         
-        # 将 trace_id 存储到请求状态中
-        request.state.trace_id = trace_id
-        
-        # 调用下一个处理器
-        response = await call_next(request)
+        # 将 trace_id 存储到请求状态中(request.state 读取 scope["state"])
+        scope.setdefault("state", {})["trace_id"] = trace_id
+        token = trace_id_var.set(trace_id)
         
-        # 在响应头中返回 trace_id
-        response.headers[self.header_name] = trace_id
+        async def send_with_trace_id(message: Message) -> None:
+            # 在响应头中返回 trace_id
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[self.header_name] = trace_id
+            await send(message)
         
-        return response
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            trace_id_var.reset(token)
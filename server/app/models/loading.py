@@ -0,0 +1,107 @@
+"""
+关系加载方案
+
+RBAC 关系默认不预加载(lazy="raise"),查询时按接口需要选择命名加载方案,
+避免加载一个用户时级联拉取角色的全部用户、菜单和权限。
+
+只读的列表/详情接口按响应模型投影列,返回行元组而非 ORM 实体,
+跳过身份映射与工作单元的实体构建开销。
+
+Usage:
+    stmt = select(AdminUser).options(*load_profile(AdminUser, "roles"))
+    stmt = select(*load_columns(AdminUser, UserResponse))
+"""
+from functools import lru_cache
+from typing import Dict, Tuple, Type
+from pydantic import BaseModel as Schema
+from sqlalchemy.orm import InstrumentedAttribute, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models.base import Base
+from app.models.user import AdminUser
+from app.models.role import AdminRole
+from app.models.menu import AdminMenu
+from app.models.permission import AdminPermission
+
+
+LOADING_PROFILES: Dict[Type[Base], Dict[str, Tuple[LoaderOption, ...]]] = {
+    AdminUser: {
+        # 列表/详情: 仅用户自身字段
+        "list": (),
+        "detail": (),
+        # 分配角色: 加载用户的角色
+        "roles": (
+            selectinload(AdminUser.roles),
+        ),
+        # 认证: 加载角色及其菜单、权限(用于构建菜单树等)
+        "auth": (
+            selectinload(AdminUser.roles).selectinload(AdminRole.menus),
+            selectinload(AdminUser.roles).selectinload(AdminRole.permissions),
+        ),
+    },
+    AdminRole: {
+        "list": (),
+        "detail": (),
+        # 查看/分配角色权限
+        "permissions": (
+            selectinload(AdminRole.permissions),
+        ),
+        # 查看/分配角色菜单
+        "menus": (
+            selectinload(AdminRole.menus),
+        ),
+    },
+    AdminMenu: {
+        "list": (),
+        "detail": (),
+    },
+    AdminPermission: {
+        "list": (),
+        "detail": (),
+    },
+}
+
+
+def load_profile(model: Type[Base], profile: str) -> Tuple[LoaderOption, ...]:
+    """
+    获取模型的命名加载方案
+    
+    Args:
+        model: 模型类
+        profile: 加载方案名称(list/detail/auth 等)
+    
+    Returns:
+        Tuple[LoaderOption, ...]: 可直接传给 select().options() 的加载选项
+    
+    Raises:
+        ValueError: 未定义的加载方案
+    """
+    try:
+        return LOADING_PROFILES[model][profile]
+    except KeyError:
+        raise ValueError(f"未定义的加载方案: {model.__name__}.{profile}")
+
+
+@lru_cache(maxsize=None)
+def load_columns(model: Type[Base], schema: Type[Schema]) -> Tuple[InstrumentedAttribute, ...]:
+    """
+    获取响应模型所需的列
+    
+    按响应模型字段顺序取模型上的同名列,查询结果为行元组,
+    可直接交给 typed_response 校验输出。
+    
+    Args:
+        model: 模型类
+        schema: 响应模型(字段需都是模型的列)
+    
+    Returns:
+        Tuple[InstrumentedAttribute, ...]: 可直接传给 select() 的列
+    
+    Raises:
+        ValueError: 响应模型字段不是模型的列
+    """
+    columns = model.__table__.columns
+    missing = [name for name in schema.model_fields if name not in columns]
+    if missing:
+        raise ValueError(f"{schema.__name__} 字段不是 {model.__name__} 的列: {', '.join(missing)}")
+    return tuple(getattr(model, name) for name in schema.model_fields)
@@ -18,6 +18,13 @@ class AdminMenu(SoftDeleteModel):
         comment="父菜单ID(0为根节点)"
     )
     
+    tree_path: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        index=True,
+        comment="物化路径(如: /2/10/),用于子树和祖先查询"
+    )
+    
     title: Mapped[str] = mapped_column(
         String(50),
         nullable=False,
@@ -78,9 +85,9 @@ class AdminMenu(SoftDeleteModel):
         "AdminRole",
         secondary=admin_role_menu,
         back_populates="menus",
-        lazy="selectin"
+        lazy="raise"
     )
-
+    
     
     def __repr__(self) -> str:
         return f"<AdminMenu(id={self.id}, name={self.name}, title={self.title})>"
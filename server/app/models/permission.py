@@ -42,7 +42,7 @@ class AdminPermission(BaseModel):
         "AdminRole",
         secondary=admin_role_permission,
         back_populates="permissions",
-        lazy="selectin"
+        lazy="raise"
     )
 
     
@@ -42,21 +42,21 @@ class AdminRole(SoftDeleteModel):
         "AdminPermission",
         secondary=admin_role_permission,
         back_populates="roles",
-        lazy="selectin"
+        lazy="raise"
     )
     
     users: Mapped[list["AdminUser"]] = relationship(
         "AdminUser",
         secondary=admin_user_role,
         back_populates="roles",
-        lazy="selectin"
+        lazy="raise"
     )
     
     menus: Mapped[list["AdminMenu"]] = relationship(
         "AdminMenu",
         secondary=admin_role_menu,
         back_populates="roles",
-        lazy="selectin"
+        lazy="raise"
     )
     
     def __repr__(self) -> str:
@@ -1,7 +1,7 @@
 """
 用户模型
 """
-from sqlalchemy import String, Integer, DateTime
+from sqlalchemy import String, Integer, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import SoftDeleteModel
 from app.models.associations import admin_user_role
@@ -11,6 +11,16 @@ class AdminUser(SoftDeleteModel):
     """管理端用户模型"""
     
     __tablename__ = "admin_user"
+    __table_args__ = (
+        # 用户名/姓名模糊搜索(MySQL ngram 全文索引,支持中文)
+        Index(
+            "ft_admin_user_search",
+            "username",
+            "real_name",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram"
+        ),
+    )
     
     username: Mapped[str] = mapped_column(
         String(50),
@@ -74,7 +84,7 @@ class AdminUser(SoftDeleteModel):
         "AdminRole",
         secondary=admin_user_role,
         back_populates="users",
-        lazy="selectin"
+        lazy="raise"
     )
 
     
@@ -27,6 +27,7 @@ class RefreshTokenRequest(BaseModel):
 class RefreshTokenResponse(BaseModel):
     """刷新 Token 响应"""
     access_token: str = Field(..., description="访问令牌")
+    refresh_token: str = Field(..., description="新的刷新令牌(旧令牌随即失效)")
     token_type: str = Field(default="Bearer", description="令牌类型")
     expires_in: int = Field(..., description="过期时间(秒)")
 
@@ -36,6 +37,15 @@ class LogoutRequest(BaseModel):
     refresh_token: str = Field(..., description="刷新令牌")
 
 
+class SessionInfo(BaseModel):
+    """登录会话信息"""
+    session_id: str = Field(..., description="会话ID")
+    ip_address: str = Field(..., description="登录IP")
+    created_at: datetime = Field(..., description="登录时间")
+    expires_at: datetime = Field(..., description="过期时间")
+    current: bool = Field(default=False, description="是否为当前会话")
+
+
 class UserInfoResponse(BaseModel):
     """用户信息响应"""
     id: int = Field(..., description="用户ID")
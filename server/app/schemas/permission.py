@@ -2,7 +2,7 @@
 权限管理相关 Schema
 """
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -37,3 +37,17 @@ class PermissionResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class PermissionTreeNode(BaseModel):
+    """
+    权限树节点 Schema
+    
+    按权限编码前缀分组: 分组节点的 code 为 `前缀:*`(如 sys:user:*),id 与 type 为空;
+    叶子节点为权限本身。
+    """
+    id: Optional[int] = Field(None, description="权限ID(分组节点为空)")
+    name: str = Field(..., description="名称")
+    code: str = Field(..., description="权限编码或分组前缀")
+    type: Optional[str] = Field(None, description="类型: MENU/BUTTON/API(分组节点为空)")
+    children: List["PermissionTreeNode"] = Field(default_factory=list, description="子节点")
@@ -1,8 +1,13 @@
 """
 统一响应模型
 """
-from typing import Any, Optional, Generic, TypeVar
-from pydantic import BaseModel, Field
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Optional, Generic, TypeVar, Union
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field, TypeAdapter
 
 T = TypeVar('T')
 
@@ -28,10 +33,9 @@ class ResponseModel(BaseModel, Generic[T]):
 class PageData(BaseModel, Generic[T]):
     """分页数据模型"""
     items: list[T] = Field(description="数据列表")
-    total: int = Field(description="总记录数")
+    total: Optional[int] = Field(default=None, description="总记录数(未请求总数时为 null)")
     page: int = Field(description="当前页码")
-    page_size: int = Field(description="每页数量")
-    total_pages: int = Field(description="总页数")
+    size: int = Field(description="每页数量")
 
     class Config:
         json_schema_extra = {
@@ -39,34 +43,182 @@ class PageData(BaseModel, Generic[T]):
                 "items": [],
                 "total": 100,
                 "page": 1,
-                "page_size": 20,
-                "total_pages": 5
+                "size": 20
             }
         }
 
 
+class CursorPageData(BaseModel, Generic[T]):
+    """游标分页数据模型"""
+    items: list[T] = Field(description="数据列表")
+    size: int = Field(description="每页数量")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标")
+    has_more: bool = Field(description="是否还有下一页")
+    total: Optional[int] = Field(default=None, description="总记录数(未请求总数时为 null)")
+
+
+def _orjson_default(value: Any) -> Any:
+    """orjson 不支持的类型(Pydantic 模型、Decimal、集合)转换"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    使用 orjson 序列化(输出 UTF-8 字节,datetime 输出 ISO 8601)
+    
+    Args:
+        content: 待序列化对象
+        
+    Returns:
+        bytes: JSON 字节
+    """
+    return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """使用 orjson 渲染的 JSON 响应(应用默认响应类)"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
 def success_response(
     data: Any = None,
     message: str = "success",
     trace_id: str = ""
-) -> dict:
+) -> ORJSONResponse:
     """
     成功响应
     
+    直接返回渲染好的响应,FastAPI 不再对返回值做校验和 jsonable_encoder 转换。
+    
     Args:
         data: 响应数据
         message: 响应消息
         trace_id: 请求追踪ID
         
     Returns:
-        dict: 统一响应格式
+        ORJSONResponse: 统一响应格式
     """
-    return {
+    return ORJSONResponse({
         "code": 200,
         "message": message,
         "data": data,
         "trace_id": trace_id
-    }
+    })
+
+
+def raw_success_response(
+    data_json: Union[bytes, str],
+    message: str = "success",
+    trace_id: str = ""
+) -> Response:
+    """
+    成功响应(data 为已序列化的 JSON)
+    
+    将缓存的 JSON 或 TypeAdapter.dump_json 的结果原样嵌入统一响应信封,
+    不再反序列化为 Python 对象后重新编码。
+    
+    Args:
+        data_json: data 字段的 JSON
+        message: 响应消息
+        trace_id: 请求追踪ID
+        
+    Returns:
+        Response: 统一响应格式
+    """
+    if isinstance(data_json, str):
+        data_json = data_json.encode()
+    body = b"".join((
+        b'{"code":200,"message":', orjson.dumps(message),
+        b',"data":', data_json,
+        b',"trace_id":', orjson.dumps(trace_id),
+        b"}"
+    ))
+    return Response(content=body, media_type="application/json")
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 使用弱比较: 忽略 W/ 前缀,* 匹配任意值"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def etag_response(
+    request: Request,
+    data_json: Union[bytes, str],
+    etag: str,
+    trace_id: str = ""
+) -> Response:
+    """
+    带 ETag 的成功响应
+    
+    请求的 If-None-Match 与 etag 匹配时返回不带响应体的 304,
+    否则同 raw_success_response。Cache-Control: no-cache 允许浏览器保存响应,
+    但每次使用前都需向服务端验证。
+    
+    Args:
+        request: 请求对象
+        data_json: data 字段的 JSON
+        etag: 由 data 内容计算的强 ETag(带双引号)
+        trace_id: 请求追踪ID
+        
+    Returns:
+        Response: 304 或统一响应格式
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    response = raw_success_response(data_json, trace_id=trace_id)
+    response.headers.update(headers)
+    return response
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(data_type: Any) -> TypeAdapter:
+    return TypeAdapter(data_type)
+
+
+def typed_response(
+    data_type: Any,
+    data: Any,
+    message: str = "success",
+    trace_id: str = ""
+) -> Response:
+    """
+    类型化成功响应
+    
+    ORM 对象或 Row 按 data_type 直接读取属性构建一次模型,再由 pydantic-core
+    序列化为 JSON 字节嵌入响应信封,不再经过 model_dump 的中间字典和 FastAPI 的二次校验。
+    路由上以 response_model=ResponseModel[data_type] 声明文档结构。
+    
+    Args:
+        data_type: data 字段类型(如 PageData[UserResponse]、List[RoleResponse])
+        data: ORM 对象、Row 或由其组成的字典/列表
+        message: 响应消息
+        trace_id: 请求追踪ID
+        
+    Returns:
+        Response: 统一响应格式
+    """
+    adapter = _type_adapter(data_type)
+    return raw_success_response(
+        adapter.dump_json(adapter.validate_python(data, from_attributes=True)),
+        message=message,
+        trace_id=trace_id
+    )
 
 
 def error_response(
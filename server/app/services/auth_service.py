@@ -1,24 +1,30 @@
 """
 认证服务
 """
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
 
 from app.models.user import AdminUser
-from app.schemas.auth import TokenResponse, RefreshTokenResponse
-from app.utils.password import verify_password
-from app.utils.jwt import (
+from app.models.loading import load_profile
+from app.schemas.auth import TokenResponse, RefreshTokenResponse, SessionInfo
+from app.core.security import (
+    verify_password,
+    hash_password,
+    needs_rehash,
     create_access_token,
     create_refresh_token,
+    generate_jti,
     decode_token,
     verify_token_type
 )
 from app.core.config import settings
-from app.core.exceptions import UnauthorizedException, BusinessException
-from app.db.redis import redis_client
+from app.core.exceptions import UnauthorizedException, BusinessException, NotFoundException
+from app.services.permission_service import PermissionService
+from app.services.session_service import SessionService, ROTATE_OK, ROTATE_REUSED
 
 
 class AuthService:
@@ -53,9 +59,13 @@ class AuthService:
             return None
         
         # 验证密码
-        if not verify_password(password, user.password_hash):
+        if not await verify_password(password, user.password_hash):
             return None
         
+        # 计算成本与当前配置不一致时透明地重新哈希(随登录信息一起提交)
+        if needs_rehash(user.password_hash):
+            user.password_hash = await hash_password(password)
+        
         # 检查用户状态
         if user.status != 1:
             raise BusinessException("用户已被禁用")
@@ -92,22 +102,30 @@ class AuthService:
         # 更新最后登录信息
         user.last_login_at = datetime.utcnow()
         user.last_login_ip = ip_address
-        await db.commit()
+        await db.flush()
+        
+        # 预热权限快照,后续请求的权限检查直接命中缓存
+        await PermissionService.get_snapshot(db, user.id)
         
-        # 生成 Token
+        # 生成 Token(Access Token 通过 sid 关联所属的登录会话)
+        session_id = generate_jti()
+        jti = generate_jti()
         token_data = {
             "sub": str(user.id),
-            "username": user.username
+            "username": user.username,
+            "sid": session_id
         }
         
         access_token = create_access_token(token_data)
-        refresh_token = create_refresh_token(token_data)
+        refresh_token = create_refresh_token({**token_data, "jti": jti})
         
-        # 将 Refresh Token 存储到 Redis(用于黑名单检查)
-        await redis_client.setex(
-            f"refresh_token:{user.id}:{refresh_token}",
-            settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,  # 转换为秒
-            "1"
+        # 登记会话(Redis 中只保存 jti,不保存完整 Token)
+        await SessionService.create(
+            user_id=user.id,
+            session_id=session_id,
+            jti=jti,
+            expires_at=int(time.time()) + settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+            ip_address=ip_address
         )
         
         return TokenResponse(
@@ -120,85 +138,127 @@ class AuthService:
     @staticmethod
     async def refresh_access_token(refresh_token: str) -> RefreshTokenResponse:
         """
-        刷新 Access Token
+        刷新 Access Token 并轮换 Refresh Token
+        
+        校验与轮换在一个 Lua 脚本中完成(一次 Redis 往返);已被轮换掉的
+        Refresh Token 再次使用时视为泄露,吊销整个会话。
         
         Args:
             refresh_token: Refresh Token
             
         Returns:
-            RefreshTokenResponse: 新的 Access Token
+            RefreshTokenResponse: 新的 Access Token 与 Refresh Token
             
         Raises:
-            UnauthorizedException: Token 无效或已过期
+            UnauthorizedException: Token 无效、已过期或被重复使用
         """
         try:
             # 解码 Token
             payload = decode_token(refresh_token)
-            
-            # 验证 Token 类型
-            if not verify_token_type(payload, "refresh"):
-                raise UnauthorizedException("Token 类型错误")
-            
-            # 检查 Token 是否在黑名单中
-            user_id = payload.get("sub")
-            is_blacklisted = await redis_client.get(f"token:blacklist:{refresh_token}")
-            if is_blacklisted:
-                raise UnauthorizedException("Token 已失效")
-            
-            # 检查 Token 是否存在于 Redis
-            token_exists = await redis_client.get(f"refresh_token:{user_id}:{refresh_token}")
-            if not token_exists:
-                raise UnauthorizedException("Token 不存在或已过期")
-            
-            # 生成新的 Access Token
-            token_data = {
-                "sub": user_id,
-                "username": payload.get("username")
-            }
-            access_token = create_access_token(token_data)
-            
-            return RefreshTokenResponse(
-                access_token=access_token,
-                token_type="Bearer",
-                expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
-            )
-            
         except JWTError:
             raise UnauthorizedException("Token 无效或已过期")
+        
+        # 验证 Token 类型
+        if not verify_token_type(payload, "refresh"):
+            raise UnauthorizedException("Token 类型错误")
+        
+        user_id = payload.get("sub")
+        session_id = payload.get("sid")
+        jti = payload.get("jti")
+        if not user_id or not session_id or not jti:
+            raise UnauthorizedException("Token 无效")
+        
+        # 新 Token 沿用会话的过期时间,轮换不会延长会话
+        new_jti = generate_jti()
+        token_data = {
+            "sub": user_id,
+            "username": payload.get("username"),
+            "sid": session_id
+        }
+        new_refresh_token = create_refresh_token({**token_data, "jti": new_jti, "exp": payload["exp"]})
+        
+        result = await SessionService.rotate(int(user_id), session_id, jti, new_jti)
+        if result == ROTATE_REUSED:
+            raise UnauthorizedException("Token 已失效,请重新登录")
+        if result != ROTATE_OK:
+            raise UnauthorizedException("Token 不存在或已过期")
+        
+        return RefreshTokenResponse(
+            access_token=create_access_token(token_data),
+            refresh_token=new_refresh_token,
+            token_type="Bearer",
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        )
     
     @staticmethod
     async def logout(user_id: int, refresh_token: str) -> None:
         """
-        用户登出
+        用户登出(吊销 Refresh Token 所属的会话)
         
         Args:
             user_id: 用户 ID
             refresh_token: Refresh Token
         """
         try:
-            # 解码 Token 获取过期时间
             payload = decode_token(refresh_token)
-            exp = payload.get("exp")
-            
-            if exp:
-                # 计算剩余有效期
-                now = datetime.utcnow().timestamp()
-                ttl = int(exp - now)
-                
-                if ttl > 0:
-                    # 将 Token 加入黑名单
-                    await redis_client.setex(
-                        f"token:blacklist:{refresh_token}",
-                        ttl,
-                        "1"
-                    )
-            
-            # 删除 Redis 中的 Refresh Token
-            await redis_client.delete(f"refresh_token:{user_id}:{refresh_token}")
-            
         except JWTError:
-            # Token 无效时也认为登出成功
-            pass
+            # Token 无效或已过期时也认为登出成功(过期会话会在下次登录时清理)
+            return
+        
+        session_id = payload.get("sid")
+        if session_id and payload.get("sub") == str(user_id):
+            await SessionService.revoke(user_id, session_id)
+    
+    @staticmethod
+    async def logout_all(user_id: int) -> None:
+        """
+        退出所有设备(吊销用户的全部会话)
+        
+        已签发的 Access Token 在过期前仍然有效,但无法再刷新。
+        
+        Args:
+            user_id: 用户 ID
+        """
+        await SessionService.revoke_all(user_id)
+    
+    @staticmethod
+    async def list_sessions(user_id: int, current_session_id: Optional[str] = None) -> List[SessionInfo]:
+        """
+        获取用户的登录会话列表
+        
+        Args:
+            user_id: 用户 ID
+            current_session_id: 当前请求所属的会话 ID
+        
+        Returns:
+            List[SessionInfo]: 会话列表(按登录时间倒序)
+        """
+        entries = await SessionService.list_sessions(user_id)
+        return [
+            SessionInfo(
+                session_id=entry.session_id,
+                ip_address=entry.ip,
+                created_at=datetime.fromtimestamp(entry.issued_at, tz=timezone.utc),
+                expires_at=datetime.fromtimestamp(entry.expires_at, tz=timezone.utc),
+                current=entry.session_id == current_session_id
+            )
+            for entry in entries
+        ]
+    
+    @staticmethod
+    async def revoke_session(user_id: int, session_id: str) -> None:
+        """
+        吊销指定会话
+            
+        Args:
+            user_id: 用户 ID
+            session_id: 会话 ID
+        
+        Raises:
+            NotFoundException: 会话不存在
+        """
+        if not await SessionService.revoke(user_id, session_id):
+            raise NotFoundException("会话不存在或已失效")
     
     @staticmethod
     async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[AdminUser]:
@@ -212,13 +272,7 @@ class AuthService:
         Returns:
             AdminUser: 用户对象(包含角色和菜单关系)
         """
-        from sqlalchemy.orm import selectinload
-        from app.models.role import AdminRole
-        
-        stmt = select(AdminUser).options(
-            selectinload(AdminUser.roles).selectinload(AdminRole.menus),
-            selectinload(AdminUser.roles).selectinload(AdminRole.permissions)
-        ).where(
+        stmt = select(AdminUser).options(*load_profile(AdminUser, "auth")).where(
             AdminUser.id == user_id,
             AdminUser.deleted_at.is_(None)
         )
@@ -1,15 +1,29 @@
 """
 菜单服务
 """
-from typing import List, Optional
-from sqlalchemy import select, delete
+from typing import Dict, List, Optional
+from datetime import datetime
+from pydantic import TypeAdapter
+from sqlalchemy import select, delete, update, func, literal, String
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.menu import AdminMenu
-from app.models.user import AdminUser
+from app.models.associations import admin_role_menu
+from app.models.loading import load_profile
 from app.schemas.menu import MenuTreeNode, MenuRoute, MenuMeta
-from app.services.permission_service import PermissionService
+from app.services.permission_service import PermissionSnapshot
+from app.core.config import settings
 from app.core.exceptions import NotFoundException, BusinessException
+from app.db.session import after_commit
+from app.utils.cache import VersionedCache
+
+# 菜单路由缓存(按角色集合缓存序列化后的路由树,菜单或角色菜单变更时递增版本号)
+menu_route_cache = VersionedCache(
+    namespace="menu:routes",
+    ttl=settings.MENU_CACHE_TTL
+)
+
+_menu_routes_adapter = TypeAdapter(List[MenuRoute])
 
 
 class MenuService:
@@ -28,7 +42,7 @@ class MenuService:
             List[MenuTreeNode]: 菜单树
         """
         # 查询所有菜单
-        stmt = select(AdminMenu).where(AdminMenu.deleted_at.is_(None))
+        stmt = select(AdminMenu).options(*load_profile(AdminMenu, "list")).where(AdminMenu.deleted_at.is_(None))
         if not include_disabled:
             stmt = stmt.where(AdminMenu.status == 1)
         stmt = stmt.order_by(AdminMenu.sort.asc(), AdminMenu.id.asc())
@@ -40,50 +54,66 @@ class MenuService:
         return MenuService._build_tree(menus, 0)
     
     @staticmethod
-    async def get_my_menu_tree(db: AsyncSession, user: AdminUser) -> List[MenuRoute]:
+    async def get_my_menu_tree(db: AsyncSession, principal: PermissionSnapshot) -> str:
         """
         获取当前用户的菜单树(用于前端动态路由)
         
+        结果按角色集合缓存为序列化后的 JSON,角色相同的用户共享同一份缓存,
+        命中时不访问数据库。
+        
         Args:
             db: 数据库会话
-            user: 当前用户
+            principal: 当前登录主体
             
         Returns:
-            List[MenuRoute]: 菜单路由树
+            str: 菜单路由树 JSON(List[MenuRoute])
         """
-        # 超级管理员返回所有菜单
-        if PermissionService.is_super_admin(user):
-            stmt = select(AdminMenu).where(
-                AdminMenu.deleted_at.is_(None),
-                AdminMenu.status == 1
-            ).order_by(AdminMenu.sort.asc(), AdminMenu.id.asc())
-            result = await db.execute(stmt)
-            menus = result.scalars().all()
+        if principal.is_super_admin:
+            cache_key = "super"
+        elif principal.role_ids:
+            cache_key = ",".join(str(role_id) for role_id in sorted(principal.role_ids))
         else:
-            # 普通用户根据角色获取菜单
-            menu_ids = set()
-            for role in user.roles:
-                if role.menus:
-                    for menu in role.menus:
-                        if menu.status == 1 and menu.deleted_at is None:
-                            menu_ids.add(menu.id)
-            
-            if not menu_ids:
-                return []
-            
-            stmt = select(AdminMenu).where(
-                AdminMenu.id.in_(menu_ids),
-                AdminMenu.deleted_at.is_(None),
-                AdminMenu.status == 1
-            ).order_by(AdminMenu.sort.asc(), AdminMenu.id.asc())
-            result = await db.execute(stmt)
-            menus = result.scalars().all()
+            return "[]"
         
-        # 构建树形结构
-        tree = MenuService._build_tree(menus, 0)
+        version = await menu_route_cache.get_version()
+        if version is not None:
+            cached = await menu_route_cache.get(cache_key, version, str)
+            if cached is not None:
+                return cached
+        
+        stmt = select(AdminMenu).where(
+            AdminMenu.deleted_at.is_(None),
+            AdminMenu.status == 1
+        ).order_by(AdminMenu.sort.asc(), AdminMenu.id.asc())
+        
+        # 普通用户根据角色获取菜单(超级管理员返回所有菜单)
+        if not principal.is_super_admin:
+            stmt = stmt.join(
+                admin_role_menu, admin_role_menu.c.menu_id == AdminMenu.id
+            ).where(
+                admin_role_menu.c.role_id.in_(principal.role_ids)
+            ).distinct()
+        
+        result = await db.execute(stmt)
+        menus = result.scalars().all()
+        
+        # 构建树形结构并转换为前端路由格式
+        routes = MenuService._convert_to_routes(MenuService._build_tree(menus, 0))
+        routes_json = _menu_routes_adapter.dump_json(routes).decode()
+        
+        if version is not None:
+            await menu_route_cache.set(cache_key, version, routes_json, str)
         
-        # 转换为前端路由格式
-        return MenuService._convert_to_routes(tree)
+        return routes_json
+    
+    @staticmethod
+    async def invalidate_cache() -> None:
+        """
+        使菜单路由缓存失效
+        
+        在菜单增删改及角色菜单分配后调用
+        """
+        await menu_route_cache.bump()
     
     @staticmethod
     async def get_menu_by_id(db: AsyncSession, menu_id: int) -> Optional[AdminMenu]:
@@ -97,7 +127,7 @@ class MenuService:
         Returns:
             AdminMenu: 菜单对象
         """
-        stmt = select(AdminMenu).where(
+        stmt = select(AdminMenu).options(*load_profile(AdminMenu, "detail")).where(
             AdminMenu.id == menu_id,
             AdminMenu.deleted_at.is_(None)
         )
@@ -126,11 +156,16 @@ class MenuService:
         if existing_menu:
             raise BusinessException(f"路由名称 {menu_data['name']} 已存在")
         
-        # 创建菜单
-        menu = AdminMenu(**menu_data)
+        parent_path = await MenuService._get_parent_path(db, menu_data.get("parent_id") or 0)
+        
+        # 创建菜单(tree_path 无默认值,先以父路径占位,获取 ID 后写入完整路径)
+        menu = AdminMenu(**menu_data, tree_path=parent_path)
         db.add(menu)
-        await db.commit()
+        await db.flush()
+        menu.tree_path = f"{parent_path}{menu.id}/"
+        await db.flush()
         await db.refresh(menu)
+        after_commit(db, MenuService.invalidate_cache)
         
         return menu
     
@@ -162,13 +197,33 @@ class MenuService:
             if existing_menu:
                 raise BusinessException(f"路由名称 {menu_data['name']} 已存在")
         
+        # 移动菜单: 用一条 UPDATE 重写整棵子树的物化路径
+        new_parent_id = menu_data.get("parent_id")
+        if new_parent_id is not None and new_parent_id != menu.parent_id:
+            menu.tree_path = await MenuService._checked_tree_path(db, menu.id, menu.parent_id, menu.tree_path)
+            parent_path = await MenuService._get_parent_path(db, new_parent_id)
+            if parent_path.startswith(menu.tree_path):
+                raise BusinessException("不能将菜单移动到自身或其子菜单下")
+            
+            old_path = menu.tree_path
+            new_path = f"{parent_path}{menu.id}/"
+            stmt = (
+                update(AdminMenu)
+                .where(AdminMenu.tree_path.startswith(old_path))
+                .values(tree_path=literal(new_path, String) + func.substring(AdminMenu.tree_path, len(old_path) + 1, type_=String))
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(stmt)
+            menu.tree_path = new_path
+        
         # 更新菜单
         for key, value in menu_data.items():
             if value is not None:
                 setattr(menu, key, value)
         
-        await db.commit()
+        await db.flush()
         await db.refresh(menu)
+        after_commit(db, MenuService.invalidate_cache)
         
         return menu
     
@@ -185,67 +240,149 @@ class MenuService:
         if not menu:
             raise NotFoundException("菜单不存在")
         
-        # 获取所有子菜单 ID
-        child_ids = await MenuService._get_all_child_ids(db, menu_id)
-        child_ids.append(menu_id)
+        # 按物化路径前缀一次性软删除整棵子树
+        menu.tree_path = await MenuService._checked_tree_path(db, menu.id, menu.parent_id, menu.tree_path)
+        await db.flush()
+        stmt = (
+            update(AdminMenu)
+            .where(
+                AdminMenu.tree_path.startswith(menu.tree_path),
+                AdminMenu.deleted_at.is_(None)
+            )
+            .values(deleted_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(stmt)
         
-        # 软删除
-        from datetime import datetime
-        stmt = select(AdminMenu).where(AdminMenu.id.in_(child_ids))
-        result = await db.execute(stmt)
-        menus = result.scalars().all()
+        after_commit(db, MenuService.invalidate_cache)
+    
+    @staticmethod
+    async def get_ancestors(db: AsyncSession, menu_id: int) -> List[AdminMenu]:
+        """
+        获取菜单的祖先链(用于面包屑),按从根到自身排序
         
-        for m in menus:
-            m.deleted_at = datetime.utcnow()
+        Args:
+            db: 数据库会话
+            menu_id: 菜单 ID
+        
+        Returns:
+            List[AdminMenu]: 祖先菜单列表(包含自身)
+        """
+        menu = await MenuService.get_menu_by_id(db, menu_id)
+        if not menu:
+            raise NotFoundException("菜单不存在")
         
-        await db.commit()
+        ancestor_ids = [int(part) for part in menu.tree_path.strip("/").split("/") if part]
+        
+        stmt = select(AdminMenu).where(
+            AdminMenu.id.in_(ancestor_ids),
+            AdminMenu.deleted_at.is_(None)
+        )
+        result = await db.execute(stmt)
+        menus_by_id = {m.id: m for m in result.scalars().all()}
+        
+        return [menus_by_id[i] for i in ancestor_ids if i in menus_by_id]
     
     @staticmethod
-    async def _get_all_child_ids(db: AsyncSession, parent_id: int) -> List[int]:
+    async def _get_parent_path(db: AsyncSession, parent_id: int) -> str:
         """
-        递归获取所有子菜单 ID
+        获取父菜单的物化路径
         
         Args:
             db: 数据库会话
-            parent_id: 父菜单 ID
+            parent_id: 父菜单 ID(0 为根节点)
             
         Returns:
-            List[int]: 子菜单 ID 列表
+            str: 父菜单路径,根节点返回 "/"
+        
+        Raises:
+            NotFoundException: 父菜单不存在
         """
-        stmt = select(AdminMenu).where(
-            AdminMenu.parent_id == parent_id,
+        if parent_id == 0:
+            return "/"
+        
+        stmt = select(AdminMenu.tree_path, AdminMenu.parent_id).where(
+            AdminMenu.id == parent_id,
             AdminMenu.deleted_at.is_(None)
         )
         result = await db.execute(stmt)
-        children = result.scalars().all()
+        parent = result.one_or_none()
+        if parent is None:
+            raise NotFoundException("父菜单不存在")
         
-        child_ids = []
-        for child in children:
-            child_ids.append(child.id)
-            # 递归获取子菜单的子菜单
-            sub_child_ids = await MenuService._get_all_child_ids(db, child.id)
-            child_ids.extend(sub_child_ids)
+        parent_path = await MenuService._checked_tree_path(db, parent_id, parent.parent_id, parent.tree_path)
+        if parent_path != parent.tree_path:
+            await db.execute(
+                update(AdminMenu)
+                .where(AdminMenu.id == parent_id)
+                .values(tree_path=parent_path)
+                .execution_options(synchronize_session=False)
+            )
         
-        return child_ids
+        return parent_path
+    
+    @staticmethod
+    async def _checked_tree_path(db: AsyncSession, menu_id: int, parent_id: int, tree_path: str) -> str:
+        """
+        校验菜单的物化路径,异常时沿 parent_id 链重新计算
+        
+        子树删除和移动以 tree_path 做前缀匹配: 路径为空时会匹配全表,
+        不以 /{id}/ 结尾时会波及无关菜单。绕过服务层写入的菜单可能带有这类路径。
+        
+        Args:
+            db: 数据库会话
+            menu_id: 菜单 ID
+            parent_id: 父菜单 ID(0 为根节点)
+            tree_path: 当前存储的物化路径
+        
+        Returns:
+            str: 有效的物化路径(由调用方负责写回)
+        
+        Raises:
+            BusinessException: 祖先菜单不存在或父子关系成环
+        """
+        if tree_path.startswith("/") and tree_path.endswith(f"/{menu_id}/"):
+            return tree_path
+        
+        ids = [menu_id]
+        while parent_id:
+            if parent_id in ids:
+                raise BusinessException(f"菜单 {menu_id} 的父子关系存在循环")
+            ids.append(parent_id)
+            result = await db.execute(select(AdminMenu.parent_id).where(AdminMenu.id == parent_id))
+            parent_id = result.scalar_one_or_none()
+            if parent_id is None:
+                raise BusinessException(f"菜单 {ids[-2]} 的父菜单 {ids[-1]} 不存在")
+        
+        return "/" + "".join(f"{id_}/" for id_ in reversed(ids))
     
     @staticmethod
     def _build_tree(menus: List[AdminMenu], parent_id: int) -> List[MenuTreeNode]:
         """
-        构建菜单树
+        构建菜单树(单次遍历,O(n))
+        
+        父节点不在列表中的菜单会被丢弃,子节点顺序与 menus 顺序一致。
         
         Args:
-            menus: 菜单列表
-            parent_id: 父菜单 ID
+            menus: 菜单列表(已排序)
+            parent_id: 根节点的父菜单 ID
             
         Returns:
             List[MenuTreeNode]: 菜单树
         """
+        nodes: Dict[int, MenuTreeNode] = {
+            menu.id: MenuTreeNode.model_validate(menu) for menu in menus
+        }
+        
         tree = []
         for menu in menus:
+            node = nodes[menu.id]
             if menu.parent_id == parent_id:
-                node = MenuTreeNode.model_validate(menu)
-                node.children = MenuService._build_tree(menus, menu.id)
                 tree.append(node)
+            else:
+                parent = nodes.get(menu.parent_id)
+                if parent is not None:
+                    parent.children.append(node)
         
         return tree
     
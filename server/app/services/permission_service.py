@@ -1,11 +1,92 @@
 """
 权限服务
 """
-from typing import List, Set
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+from pydantic import TypeAdapter
+from sqlalchemy import select, and_
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import AdminUser
 from app.models.role import AdminRole
 from app.models.permission import AdminPermission
+from app.models.associations import admin_user_role, admin_role_permission
+from app.models.loading import load_columns
+from app.schemas.permission import PermissionResponse, PermissionTreeNode
+from app.core.config import settings
+from app.utils.cache import VersionedCache
+
+SUPER_ADMIN_ROLE_CODE = "SUPER_ADMIN"
+
+# 权限快照缓存(权限图变更时递增版本号统一失效)
+permission_cache = VersionedCache(
+    namespace="perm:snapshot",
+    ttl=settings.PERMISSION_CACHE_TTL,
+    max_local_entries=settings.PERMISSION_CACHE_LOCAL_SIZE
+)
+
+# 权限目录缓存(权限列表与权限树的 JSON 及 ETag,权限增删改时递增版本号)
+permission_catalog_cache = VersionedCache(
+    namespace="perm:catalog",
+    ttl=settings.PERMISSION_CACHE_TTL,
+    max_local_entries=2
+)
+
+_permission_list_adapter = TypeAdapter(List[PermissionResponse])
+_permission_tree_adapter = TypeAdapter(List[PermissionTreeNode])
+
+
+@dataclass(frozen=True)
+class PermissionSnapshot:
+    """
+    用户权限快照
+    
+    由用户的基本信息、角色与权限编译而成,权限检查只需做集合成员判断。
+    同时作为请求期间的轻量登录主体使用,无需加载 AdminUser 对象图。
+    """
+    user_id: int
+    username: str = ""
+    status: int = 1
+    roles: FrozenSet[str] = field(default_factory=frozenset)
+    role_ids: FrozenSet[int] = field(default_factory=frozenset)
+    permissions: FrozenSet[str] = field(default_factory=frozenset)
+    is_super_admin: bool = False
+    version: int = 0
+    
+    @property
+    def id(self) -> int:
+        """用户 ID(与 AdminUser.id 保持一致的访问方式)"""
+        return self.user_id
+    
+    def to_json(self) -> str:
+        """序列化为 JSON 字符串"""
+        return json.dumps({
+            "user_id": self.user_id,
+            "username": self.username,
+            "status": self.status,
+            "roles": sorted(self.roles),
+            "role_ids": sorted(self.role_ids),
+            "permissions": sorted(self.permissions),
+            "is_super_admin": self.is_super_admin,
+            "version": self.version
+        })
+    
+    @classmethod
+    def from_json(cls, raw: str) -> "PermissionSnapshot":
+        """从 JSON 字符串反序列化"""
+        data = json.loads(raw)
+        return cls(
+            user_id=data["user_id"],
+            username=data["username"],
+            status=data["status"],
+            roles=frozenset(data["roles"]),
+            role_ids=frozenset(data["role_ids"]),
+            permissions=frozenset(data["permissions"]),
+            is_super_admin=data["is_super_admin"],
+            version=data["version"]
+        )
 
 
 class PermissionService:
@@ -26,7 +107,7 @@ class PermissionService:
             return False
         
         for role in user.roles:
-            if role.code == "SUPER_ADMIN":
+            if role.code == SUPER_ADMIN_ROLE_CODE:
                 return True
         
         return False
@@ -55,75 +136,249 @@ class PermissionService:
         return permissions
     
     @staticmethod
-    def has_permission(user: AdminUser, permission_code: str) -> bool:
+    async def get_snapshot(db: AsyncSession, user_id: int) -> Optional[PermissionSnapshot]:
+        """
+        获取用户权限快照(进程内缓存 -> Redis -> 数据库)
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户 ID
+        
+        Returns:
+            PermissionSnapshot: 权限快照,用户不存在或已删除返回 None
+        """
+        version = await permission_cache.get_version()
+        if version is None:
+            return await PermissionService.build_snapshot(db, user_id, 0)
+        
+        key = str(user_id)
+        snapshot = await permission_cache.get(key, version, PermissionSnapshot.from_json)
+        if snapshot is not None:
+            return snapshot
+        
+        snapshot = await PermissionService.build_snapshot(db, user_id, version)
+        if snapshot is not None:
+            await permission_cache.set(key, version, snapshot, PermissionSnapshot.to_json)
+        return snapshot
+    
+    @staticmethod
+    async def build_snapshot(db: AsyncSession, user_id: int, version: int) -> Optional[PermissionSnapshot]:
+        """
+        从数据库编译用户权限快照(单条 SQL,不加载 ORM 对象图)
+        
+        Args:
+            db: 数据库会话
+            user_id: 用户 ID
+            version: 当前权限版本号
+        
+        Returns:
+            PermissionSnapshot: 权限快照,用户不存在或已删除返回 None
+        """
+        stmt = (
+            select(
+                AdminUser.username,
+                AdminUser.status,
+                AdminRole.id,
+                AdminRole.code,
+                AdminPermission.code
+            )
+            .select_from(AdminUser)
+            .outerjoin(admin_user_role, admin_user_role.c.user_id == AdminUser.id)
+            .outerjoin(
+                AdminRole,
+                and_(AdminRole.id == admin_user_role.c.role_id, AdminRole.deleted_at.is_(None))
+            )
+            .outerjoin(admin_role_permission, admin_role_permission.c.role_id == AdminRole.id)
+            .outerjoin(AdminPermission, AdminPermission.id == admin_role_permission.c.permission_id)
+            .where(
+                AdminUser.id == user_id,
+                AdminUser.deleted_at.is_(None)
+            )
+        )
+        result = await db.execute(stmt)
+        rows = result.all()
+        if not rows:
+            return None
+        
+        username, status = rows[0][0], rows[0][1]
+        role_ids = set()
+        role_codes = set()
+        permissions = set()
+        for _, _, role_id, role_code, permission_code in rows:
+            if role_id is not None:
+                role_ids.add(role_id)
+                role_codes.add(role_code)
+            if permission_code:
+                permissions.add(permission_code)
+        
+        return PermissionSnapshot(
+            user_id=user_id,
+            username=username,
+            status=status,
+            roles=frozenset(role_codes),
+            role_ids=frozenset(role_ids),
+            permissions=frozenset(permissions),
+            is_super_admin=SUPER_ADMIN_ROLE_CODE in role_codes,
+            version=version
+        )
+    
+    @staticmethod
+    async def invalidate_snapshots() -> None:
+        """
+        使所有用户的权限快照失效
+        
+        在角色分配、权限分配、权限增删改及用户状态变更后调用
+        """
+        await permission_cache.bump()
+    
+    @staticmethod
+    async def get_catalog(db: AsyncSession, view: str) -> Tuple[str, str]:
+        """
+        获取权限目录(全部权限的列表或树)
+        
+        结果按目录版本号缓存为序列化后的 JSON,命中时不访问数据库;
+        ETag 由 JSON 内容计算,各 worker 一致,Redis 不可用时同样有效。
+        
+        Args:
+            db: 数据库会话
+            view: list-权限列表(List[PermissionResponse]), tree-权限树(List[PermissionTreeNode])
+        
+        Returns:
+            Tuple[str, str]: (ETag, JSON)
+        """
+        version = await permission_catalog_cache.get_version()
+        if version is not None:
+            cached = await permission_catalog_cache.get(view, version, _load_catalog_entry)
+            if cached is not None:
+                return cached
+        
+        stmt = select(*load_columns(AdminPermission, PermissionResponse)).order_by(AdminPermission.id)
+        result = await db.execute(stmt)
+        rows = result.all()
+        
+        if view == "tree":
+            data_json = _permission_tree_adapter.dump_json(PermissionService._build_tree(rows))
+        else:
+            data_json = _permission_list_adapter.dump_json(
+                _permission_list_adapter.validate_python(rows, from_attributes=True)
+            )
+        entry = (f'"{hashlib.sha256(data_json).hexdigest()[:32]}"', data_json.decode())
+        
+        if version is not None:
+            await permission_catalog_cache.set(view, version, entry, _dump_catalog_entry)
+        
+        return entry
+    
+    @staticmethod
+    def _build_tree(rows: Sequence[Row]) -> List[PermissionTreeNode]:
+        """
+        按编码前缀构建权限树
+        
+        sys:user:list 挂在分组 sys:user:* 下,sys:user:* 挂在 sys:* 下;
+        分组内有 MENU 类型权限时以其名称作为分组名称,否则使用前缀最后一段。
+        
+        Args:
+            rows: 按 id 排序的权限行
+        
+        Returns:
+            List[PermissionTreeNode]: 权限树
+        """
+        roots: List[PermissionTreeNode] = []
+        groups: Dict[str, PermissionTreeNode] = {}
+        
+        def group(prefix: str) -> PermissionTreeNode:
+            node = groups.get(prefix)
+            if node is None:
+                parent, _, name = prefix.rpartition(":")
+                node = PermissionTreeNode(name=name, code=f"{prefix}:*")
+                (group(parent).children if parent else roots).append(node)
+                groups[prefix] = node
+            return node
+        
+        for row in rows:
+            node = PermissionTreeNode(id=row.id, name=row.name, code=row.code, type=row.type)
+            prefix = row.code.rpartition(":")[0]
+            if not prefix:
+                roots.append(node)
+                continue
+            
+            parent = group(prefix)
+            parent.children.append(node)
+            if row.type == "MENU":
+                parent.name = row.name
+        
+        return roots
+    
+    @staticmethod
+    async def invalidate_catalog() -> None:
+        """
+        使权限目录缓存失效
+        
+        在权限增删改后调用
+        """
+        await permission_catalog_cache.bump()
+    
+    @staticmethod
+    def has_permission(snapshot: PermissionSnapshot, permission_code: str) -> bool:
         """
         检查用户是否有指定权限
         
         Args:
-            user: 用户对象
+            snapshot: 用户权限快照
             permission_code: 权限编码
             
         Returns:
             bool: 是否有权限
         """
         # 超级管理员拥有所有权限
-        if PermissionService.is_super_admin(user):
+        if snapshot.is_super_admin:
             return True
         
-        # 获取用户权限
-        user_permissions = PermissionService.get_user_permissions(user)
-        
-        # 检查是否有指定权限
-        return permission_code in user_permissions
+        return permission_code in snapshot.permissions
     
     @staticmethod
-    def has_any_permission(user: AdminUser, permission_codes: List[str]) -> bool:
+    def has_any_permission(snapshot: PermissionSnapshot, permission_codes: List[str]) -> bool:
         """
         检查用户是否有任意一个权限
         
         Args:
-            user: 用户对象
+            snapshot: 用户权限快照
             permission_codes: 权限编码列表
             
         Returns:
             bool: 是否有任意权限
         """
         # 超级管理员拥有所有权限
-        if PermissionService.is_super_admin(user):
+        if snapshot.is_super_admin:
             return True
         
-        # 获取用户权限
-        user_permissions = PermissionService.get_user_permissions(user)
-        
-        # 检查是否有任意权限
-        for code in permission_codes:
-            if code in user_permissions:
-                return True
-        
-        return False
+        return not snapshot.permissions.isdisjoint(permission_codes)
     
     @staticmethod
-    def has_all_permissions(user: AdminUser, permission_codes: List[str]) -> bool:
+    def has_all_permissions(snapshot: PermissionSnapshot, permission_codes: List[str]) -> bool:
         """
         检查用户是否有所有权限
         
         Args:
-            user: 用户对象
+            snapshot: 用户权限快照
             permission_codes: 权限编码列表
             
         Returns:
             bool: 是否有所有权限
         """
         # 超级管理员拥有所有权限
-        if PermissionService.is_super_admin(user):
+        if snapshot.is_super_admin:
             return True
         
-        # 获取用户权限
-        user_permissions = PermissionService.get_user_permissions(user)
-        
-        # 检查是否有所有权限
-        for code in permission_codes:
-            if code not in user_permissions:
-                return False
-        
-        return True
+        return snapshot.permissions.issuperset(permission_codes)
+
+
+def _dump_catalog_entry(entry: Tuple[str, str]) -> str:
+    """权限目录缓存值序列化(ETag 与 JSON 以换行分隔,JSON 本身不含换行)"""
+    return "\n".join(entry)
+
+
+def _load_catalog_entry(raw: str) -> Tuple[str, str]:
+    """权限目录缓存值反序列化"""
+    etag, data_json = raw.split("\n", 1)
+    return etag, data_json
@@ -0,0 +1,198 @@
+"""
+登录会话服务
+
+每个用户的登录会话存放在一个 Redis 哈希中,字段为会话 ID(sid),
+值中记录该会话当前唯一有效的 Refresh Token jti:
+
+    refresh_session:{user_id} = {sid: "exp|iat|jti|ip", ...}   TTL = Refresh Token 有效期
+
+会话数较少时哈希使用紧凑编码(listpack),每个会话只占几十字节;
+单个会话吊销为 HDEL,"退出所有设备"为一次 DEL,不再需要黑名单和 SCAN。
+
+每次刷新都会轮换 Refresh Token(同一会话内 jti 更新,过期时间不变);
+已被轮换掉的旧 Token 再次使用视为泄露,整个会话被吊销。
+"""
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.core.config import settings
+from app.db.redis import redis_client
+
+# 写入新会话并顺带清理已过期的会话(哈希字段没有独立 TTL)
+# KEYS[1]: 会话哈希  ARGV[1]: sid  ARGV[2]: 会话值  ARGV[3]: 键 TTL(秒)
+CREATE_SESSION_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+local entries = redis.call('HGETALL', KEYS[1])
+for i = 1, #entries, 2 do
+    local exp = tonumber(string.match(entries[i + 1], '^(%d+)'))
+    if exp == nil or exp <= now then
+        redis.call('HDEL', KEYS[1], entries[i])
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# 校验并轮换 Refresh Token(一次往返,原子执行)
+# KEYS[1]: 会话哈希  ARGV[1]: sid  ARGV[2]: 提交的 jti  ARGV[3]: 新 jti
+# 返回: 1-轮换成功, 0-会话不存在或已过期, -1-旧 Token 被重复使用(会话已吊销)
+ROTATE_SESSION_SCRIPT = """
+local value = redis.call('HGET', KEYS[1], ARGV[1])
+if not value then
+    return 0
+end
+local exp, iat, jti, ip = string.match(value, '^(%d+)|(%d+)|([^|]*)|(.*)$')
+local now = tonumber(redis.call('TIME')[1])
+if exp == nil or tonumber(exp) <= now then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    return 0
+end
+if jti ~= ARGV[2] then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    return -1
+end
+redis.call('HSET', KEYS[1], ARGV[1], exp .. '|' .. iat .. '|' .. ARGV[3] .. '|' .. ip)
+return 1
+"""
+
+ROTATE_OK = 1
+ROTATE_NOT_FOUND = 0
+ROTATE_REUSED = -1
+
+
+@dataclass(frozen=True)
+class SessionEntry:
+    """登录会话"""
+    session_id: str
+    jti: str
+    expires_at: int
+    issued_at: int
+    ip: str
+    
+    def encode(self) -> str:
+        """编码为哈希字段值(exp|iat|jti|ip)"""
+        return f"{self.expires_at}|{self.issued_at}|{self.jti}|{self.ip}"
+    
+    @classmethod
+    def decode(cls, session_id: str, value: str) -> Optional["SessionEntry"]:
+        """从哈希字段值解码,格式错误时返回 None"""
+        parts = value.split("|", 3)
+        if len(parts) != 4:
+            return None
+        try:
+            return cls(
+                session_id=session_id,
+                jti=parts[2],
+                expires_at=int(parts[0]),
+                issued_at=int(parts[1]),
+                ip=parts[3]
+            )
+        except ValueError:
+            return None
+
+
+class SessionService:
+    """登录会话服务"""
+    
+    @staticmethod
+    def session_key(user_id: int) -> str:
+        """用户会话哈希键"""
+        return f"refresh_session:{user_id}"
+    
+    @staticmethod
+    async def create(
+        user_id: int,
+        session_id: str,
+        jti: str,
+        expires_at: int,
+        ip_address: str = ""
+    ) -> None:
+        """
+        登记新的登录会话
+        
+        Args:
+            user_id: 用户 ID
+            session_id: 会话 ID
+            jti: 首个 Refresh Token 的 jti
+            expires_at: 会话过期时间戳(秒)
+            ip_address: 登录 IP
+        """
+        entry = SessionEntry(
+            session_id=session_id,
+            jti=jti,
+            expires_at=expires_at,
+            issued_at=int(time.time()),
+            ip=ip_address
+        )
+        await redis_client.run_script(
+            CREATE_SESSION_SCRIPT,
+            keys=[SessionService.session_key(user_id)],
+            args=[session_id, entry.encode(), settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60]
+        )
+    
+    @staticmethod
+    async def rotate(user_id: int, session_id: str, jti: str, new_jti: str) -> int:
+        """
+        校验 Refresh Token 并轮换为新的 jti
+        
+        Args:
+            user_id: 用户 ID
+            session_id: 会话 ID
+            jti: 提交的 Refresh Token 的 jti
+            new_jti: 新 Refresh Token 的 jti
+        
+        Returns:
+            int: ROTATE_OK / ROTATE_NOT_FOUND / ROTATE_REUSED(Redis 不可用时视为 ROTATE_NOT_FOUND)
+        """
+        result = await redis_client.run_script(
+            ROTATE_SESSION_SCRIPT,
+            keys=[SessionService.session_key(user_id)],
+            args=[session_id, jti, new_jti]
+        )
+        return ROTATE_NOT_FOUND if result is None else int(result)
+    
+    @staticmethod
+    async def list_sessions(user_id: int) -> List[SessionEntry]:
+        """
+        获取用户的有效会话,按登录时间倒序
+        
+        Args:
+            user_id: 用户 ID
+        
+        Returns:
+            List[SessionEntry]: 会话列表
+        """
+        raw = await redis_client.hgetall(SessionService.session_key(user_id))
+        now = time.time()
+        entries = [
+            entry for entry in (SessionEntry.decode(sid, value) for sid, value in raw.items())
+            if entry is not None and entry.expires_at > now
+        ]
+        entries.sort(key=lambda entry: entry.issued_at, reverse=True)
+        return entries
+    
+    @staticmethod
+    async def revoke(user_id: int, session_id: str) -> bool:
+        """
+        吊销单个会话
+        
+        Args:
+            user_id: 用户 ID
+            session_id: 会话 ID
+        
+        Returns:
+            bool: 会话是否存在
+        """
+        return bool(await redis_client.hdel(SessionService.session_key(user_id), session_id))
+    
+    @staticmethod
+    async def revoke_all(user_id: int) -> None:
+        """
+        吊销用户的全部会话(退出所有设备)
+        
+        Args:
+            user_id: 用户 ID
+        """
+        await redis_client.delete(SessionService.session_key(user_id))
@@ -1,14 +1,22 @@
 """
 审计日志工具
 """
+import asyncio
+import glob
 import json
+import os
+import uuid
+from datetime import datetime
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Dict, List, Optional
 from fastapi import Request
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
 
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
 from app.models.audit_log import AdminAuditLog
 from app.models.user import AdminUser
+from app.services.permission_service import PermissionSnapshot
 
 
 def get_client_ip(request: Request) -> str:
@@ -24,8 +32,240 @@ def get_user_agent(request: Request) -> str:
     return request.headers.get("User-Agent", "unknown")
 
 
-async def create_audit_log(
-    db: AsyncSession,
+class AuditLogWriter:
+    """
+    审计日志异步批量写入器
+    
+    请求路径上只做一次内存入队;后台任务按批量大小或时间间隔将日志批量
+    INSERT 到 admin_audit_log。队列满时按策略丢弃或追加写入本地文件,
+    落盘的日志在下次启动时回放入库。
+    """
+    
+    def __init__(
+        self,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow_policy: str = "drop",
+        spill_path: str = ""
+    ):
+        """
+        Args:
+            max_queue_size: 内存队列上限
+            batch_size: 单次批量写入条数
+            flush_interval: 最长刷新间隔(秒)
+            overflow_policy: 队列满时的策略: drop-丢弃, spill-写入本地文件
+            spill_path: 落盘文件路径(spill 策略使用)
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._written = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._failed = 0
+    
+    def enqueue(self, entry: Dict[str, Any]) -> None:
+        """
+        日志入队(不等待数据库写入)
+        
+        Args:
+            entry: admin_audit_log 列名到值的映射
+        """
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            if self.overflow_policy == "spill" and self.spill_path:
+                self._spill([entry])
+            else:
+                self._dropped += 1
+    
+    async def start(self) -> None:
+        """回放落盘日志并启动后台写入任务(应用启动时调用)"""
+        if self._task is not None:
+            return
+        await self._replay_spill()
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+    
+    async def stop(self) -> None:
+        """停止后台任务并写入队列中剩余的日志(应用关闭时调用)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        获取写入器指标
+        
+        Returns:
+            Dict[str, int]: 队列长度、已写入、丢弃、落盘、写入失败条数
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "dropped": self._dropped,
+            "spilled": self._spilled,
+            "failed": self._failed
+        }
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # 关闭时尚未写入的批次重新入队,由 stop() 统一写入
+                for entry in batch:
+                    self.enqueue(entry)
+                raise
+            
+            # 写入不响应取消: 取消可能在提交之后到达,此时重新入队会重复写入,
+            # 因此等待当前批次写完再退出
+            write = asyncio.ensure_future(self._write(batch))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                await write
+                raise
+    
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(AdminAuditLog), batch)
+                await db.commit()
+            self._written += len(batch)
+        except Exception as e:
+            print(f"审计日志批量写入失败: {e}")
+            if self.overflow_policy == "spill" and self.spill_path:
+                self._spill(batch)
+            else:
+                self._failed += len(batch)
+    
+    def _spill(self, entries: List[Dict[str, Any]]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self._spilled += len(entries)
+        except OSError as e:
+            print(f"审计日志落盘失败: {e}")
+            self._dropped += len(entries)
+    
+    async def _replay_spill(self) -> None:
+        """
+        回放落盘日志
+        
+        包括此前回放中途退出遗留的 .replay.<pid>.* 文件;损坏的行(如进程在落盘时
+        被杀留下的半行)跳过并计入丢弃,回放中的任何错误都不会中断应用启动。
+        """
+        if not self.spill_path:
+            return
+        
+        try:
+            paths = self._claim_spill_files()
+        except OSError as e:
+            print(f"审计日志落盘文件认领失败: {e}")
+            return
+        
+        for path in paths:
+            try:
+                await self._replay_file(path)
+            except Exception as e:
+                print(f"审计日志回放失败(文件保留在 {path}): {e}")
+    
+    def _claim_spill_files(self) -> List[str]:
+        """
+        认领待回放的文件: 重命名为本进程专属文件名后再读取,
+        多个 worker 同时启动时每个文件只有一个 worker 能认领
+        
+        Returns:
+            List[str]: 已认领的文件路径
+        """
+        leftovers = []
+        for path in glob.glob(f"{glob.escape(self.spill_path)}.replay.*"):
+            owner = path[len(self.spill_path) + len(".replay."):].split(".")[0]
+            # 仍在运行的其他 worker 可能正在回放该文件
+            if owner.isdigit() and int(owner) != os.getpid() and _pid_alive(int(owner)):
+                continue
+            leftovers.append(path)
+        
+        claimed = []
+        for path in [self.spill_path, *leftovers]:
+            replay_path = f"{self.spill_path}.replay.{os.getpid()}.{uuid.uuid4().hex[:8]}"
+            try:
+                os.replace(path, replay_path)
+            except FileNotFoundError:
+                continue
+            claimed.append(replay_path)
+        return claimed
+    
+    async def _replay_file(self, path: str) -> None:
+        entries = []
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"审计日志落盘文件 {path} 第 {lineno} 行无法解析,已丢弃: {e}")
+                    self._dropped += 1
+                    continue
+                entries.append(entry)
+        
+        for i in range(0, len(entries), self.batch_size):
+            await self._write(entries[i:i + self.batch_size])
+        os.remove(path)
+
+
+def _pid_alive(pid: int) -> bool:
+    """进程是否仍在运行(Windows 上 os.kill 会终止进程,无法探测时视为运行中)"""
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+audit_writer = AuditLogWriter(
+    max_queue_size=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+    overflow_policy=settings.AUDIT_OVERFLOW_POLICY,
+    spill_path=settings.AUDIT_SPILL_PATH
+)
+
+
+def create_audit_log(
     actor_id: int,
     action: str,
     target_type: str,
@@ -35,10 +275,9 @@ async def create_audit_log(
     user_agent: str | None = None
 ):
     """
-    创建审计日志
+    创建审计日志(入队后由 audit_writer 批量写入)
     
     Args:
-        db: 数据库会话
         actor_id: 操作人ID
         action: 操作类型
         target_type: 目标类型
@@ -47,17 +286,16 @@ async def create_audit_log(
         ip: IP地址
         user_agent: User Agent
     """
-    audit_log = AdminAuditLog(
-        actor_id=actor_id,
-        action=action,
-        target_type=target_type,
-        target_id=target_id,
-        diff=json.dumps(diff, ensure_ascii=False) if diff else None,
-        ip=ip,
-        user_agent=user_agent
-    )
-    db.add(audit_log)
-    await db.commit()
+    audit_writer.enqueue({
+        "actor_id": actor_id,
+        "action": action,
+        "target_type": target_type,
+        "target_id": target_id,
+        "diff": json.dumps(diff, ensure_ascii=False) if diff else None,
+        "ip": ip,
+        "user_agent": user_agent,
+        "created_at": datetime.now()
+    })
 
 
 def audit_log(action: str, target_type: str):
@@ -81,18 +319,15 @@ def audit_log(action: str, target_type: str):
             
             # 尝试记录审计日志
             try:
-                # 从参数中获取 request, db, current_user
+                # 从参数中获取 request, current_user
                 request: Request | None = None
-                db: AsyncSession | None = None
-                current_user: AdminUser | None = None
+                current_user: AdminUser | PermissionSnapshot | None = None
                 target_id: int | None = None
                 diff: dict | None = None
                 
                 # 从 kwargs 中提取
                 if "request" in kwargs:
                     request = kwargs["request"]
-                if "db" in kwargs:
-                    db = kwargs["db"]
                 if "current_user" in kwargs:
                     current_user = kwargs["current_user"]
                 
@@ -100,9 +335,7 @@ def audit_log(action: str, target_type: str):
                 for arg in args:
                     if isinstance(arg, Request):
                         request = arg
-                    elif isinstance(arg, AsyncSession):
-                        db = arg
-                    elif isinstance(arg, AdminUser):
+                    elif isinstance(arg, (AdminUser, PermissionSnapshot)):
                         current_user = arg
                 
                 # 获取 target_id
@@ -121,10 +354,9 @@ def audit_log(action: str, target_type: str):
                     if hasattr(result, "id"):
                         target_id = result.id
                 
-                # 记录审计日志
-                if db and current_user:
-                    await create_audit_log(
-                        db=db,
+                # 记录审计日志(仅入队)
+                if current_user:
+                    create_audit_log(
                         actor_id=current_user.id,
                         action=action,
                         target_type=target_type,
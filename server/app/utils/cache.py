@@ -0,0 +1,96 @@
+"""
+版本化缓存工具
+
+两级缓存: 进程内 LRU + Redis。每个命名空间维护一个全局版本号
+(`{namespace}:version`),数据变更时递增版本号即可让所有 worker 的
+缓存同时失效,无需逐个删除键。
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from app.db.redis import redis_client
+
+
+class VersionedCache:
+    """版本化两级缓存"""
+
+    def __init__(self, namespace: str, ttl: int = 3600, max_local_entries: int = 1024):
+        """
+        Args:
+            namespace: Redis 键前缀
+            ttl: Redis 中缓存值的过期时间(秒)
+            max_local_entries: 进程内缓存最大条目数
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_local_entries = max_local_entries
+        self._local: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()
+
+    @property
+    def version_key(self) -> str:
+        """版本号键"""
+        return f"{self.namespace}:version"
+
+    def _redis_key(self, version: int, key: str) -> str:
+        return f"{self.namespace}:{version}:{key}"
+
+    async def get_version(self) -> Optional[int]:
+        """
+        获取当前版本号
+
+        Returns:
+            Optional[int]: 版本号,Redis 不可用时返回 None(此时不使用缓存)
+        """
+        if redis_client.redis is None:
+            return None
+        value = await redis_client.get(self.version_key)
+        return int(value) if value else 0
+
+    async def bump(self) -> None:
+        """递增版本号,使该命名空间下所有缓存失效"""
+        self._local.clear()
+        await redis_client.incr(self.version_key)
+
+    async def get(self, key: str, version: int, loads: Callable[[str], Any]) -> Any:
+        """
+        读取缓存(先进程内,后 Redis)
+
+        Args:
+            key: 缓存键
+            version: 当前版本号
+            loads: Redis 原始字符串的反序列化函数
+
+        Returns:
+            Any: 缓存值,未命中返回 None
+        """
+        entry = self._local.get(key)
+        if entry is not None and entry[0] == version:
+            self._local.move_to_end(key)
+            return entry[1]
+
+        raw = await redis_client.get(self._redis_key(version, key))
+        if raw is None:
+            return None
+
+        value = loads(raw)
+        self._set_local(key, version, value)
+        return value
+
+    async def set(self, key: str, version: int, value: Any, dumps: Callable[[Any], str]) -> None:
+        """
+        写入缓存(同时写入进程内和 Redis)
+
+        Args:
+            key: 缓存键
+            version: 构建该值时读取到的版本号
+            value: 缓存值
+            dumps: 序列化为 Redis 字符串的函数
+        """
+        self._set_local(key, version, value)
+        await redis_client.setex(self._redis_key(version, key), self.ttl, dumps(value))
+
+    def _set_local(self, key: str, version: int, value: Any) -> None:
+        self._local[key] = (version, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
@@ -1,98 +0,0 @@
-"""
-JWT 工具类
-"""
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from app.core.config import settings
-
-
-def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
-    """
-    创建 Access Token
-    
-    Args:
-        data: Token 数据
-        expires_delta: 过期时间增量
-        
-    Returns:
-        str: JWT Token
-    """
-    to_encode = data.copy()
-    
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({
-        "exp": expire,
-        "iat": datetime.utcnow(),
-        "type": "access"
-    })
-    
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-
-def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
-    """
-    创建 Refresh Token
-    
-    Args:
-        data: Token 数据
-        expires_delta: 过期时间增量
-        
-    Returns:
-        str: JWT Token
-    """
-    to_encode = data.copy()
-    
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    
-    to_encode.update({
-        "exp": expire,
-        "iat": datetime.utcnow(),
-        "type": "refresh"
-    })
-    
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
-
-
-def decode_token(token: str) -> Dict[str, Any]:
-    """
-    解码 Token
-    
-    Args:
-        token: JWT Token
-        
-    Returns:
-        Dict[str, Any]: Token 数据
-        
-    Raises:
-        JWTError: Token 无效或过期
-    """
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError as e:
-        raise JWTError(f"Token 解码失败: {str(e)}")
-
-
-def verify_token_type(payload: Dict[str, Any], expected_type: str) -> bool:
-    """
-    验证 Token 类型
-    
-    Args:
-        payload: Token 数据
-        expected_type: 期望的 Token 类型(access/refresh)
-        
-    Returns:
-        bool: 类型是否匹配
-    """
-    token_type = payload.get("type")
-    return token_type == expected_type
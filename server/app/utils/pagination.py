@@ -1,9 +1,13 @@
 """
 分页工具
 """
+import base64
+import json
 from typing import TypeVar, Generic, List
 from pydantic import BaseModel
 
+from app.core.exceptions import BadRequestException
+
 
 T = TypeVar('T')
 
@@ -54,3 +58,40 @@ class PaginatedResponse(BaseModel, Generic[T]):
             page_size=page_size,
             total_pages=total_pages
         )
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    生成游标(不透明字符串,内容为上一页最后一条记录的 ID)
+    
+    Args:
+        last_id: 上一页最后一条记录的 ID
+        
+    Returns:
+        str: 游标
+    """
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    解析游标
+    
+    Args:
+        cursor: encode_cursor 生成的游标
+        
+    Returns:
+        int: 上一页最后一条记录的 ID
+        
+    Raises:
+        BadRequestException: 游标格式错误
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+    except (ValueError, KeyError, TypeError):
+        raise BadRequestException("无效的分页游标")
+    if not isinstance(last_id, int):
+        raise BadRequestException("无效的分页游标")
+    return last_id
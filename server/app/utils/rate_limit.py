@@ -1,11 +1,85 @@
 """
-登录限流工具
+限流工具
+
+- 登录限流(滑动窗口): 每个维度(IP、账号等)一个 ZSET 记录窗口内的请求时间,
+  所有维度的检查与计数在同一个 Lua 脚本中原子完成(一次 EVALSHA 往返),
+  键始终带过期时间,不会因进程崩溃遗留永久锁定的键。
+- 接口限流(令牌桶): rate_limit() 依赖,按路由组和客户端维度限制请求速率,
+  进程内以租约方式批量预取令牌,客户端远低于限额时大多数请求无需访问 Redis。
 """
-from app.utils.redis_client import redis_client
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+from fastapi import Request
+from jose import JWTError
+
+from app.core.config import settings
+from app.db.redis import redis_client
 from app.core.exceptions import TooManyRequestsException
+from app.core.security import decode_token
+
+# KEYS: 各维度限流键
+# ARGV[1]: 窗口(毫秒)  ARGV[2]: 窗口内最大次数  ARGV[3]: 本次请求的唯一成员
+# 返回: 0 表示放行(已计数);大于 0 表示被限流,值为需要等待的毫秒数(不计数)
+SLIDING_WINDOW_SCRIPT = """
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local retry_after = 0
+for _, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = tonumber(oldest[2]) + window - now
+        if wait > retry_after then
+            retry_after = wait
+        end
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+end
+return 0
+"""
+
+
+async def hit_rate_limit(keys: List[str], max_attempts: int, window: int) -> int:
+    """
+    记录一次请求并检查所有维度是否超限
+    
+    Args:
+        keys: 各维度限流键
+        max_attempts: 窗口内最大次数
+        window: 时间窗口(秒)
+    
+    Returns:
+        int: 0 表示放行,否则为需要等待的秒数(Redis 未连接时放行)
+    """
+    retry_after_ms = await redis_client.run_script(
+        SLIDING_WINDOW_SCRIPT,
+        keys,
+        [window * 1000, max_attempts, uuid.uuid4().hex]
+    )
+    if not retry_after_ms:
+        return 0
+    return math.ceil(int(retry_after_ms) / 1000)
 
 
-async def check_login_limit(ip: str, username: str, max_attempts: int = 5, window: int = 300):
+async def check_login_limit(
+    ip: str,
+    username: str,
+    max_attempts: int = settings.LOGIN_MAX_ATTEMPTS,
+    window: int = settings.LOGIN_LIMIT_WINDOW
+):
     """
     检查登录限流
     
@@ -18,21 +92,16 @@ async def check_login_limit(ip: str, username: str, max_attempts: int = 5, windo
     Raises:
         TooManyRequestsException: 超过限流次数
     """
-    # 检查 IP 限流
-    ip_key = f"login_limit:ip:{ip}"
-    ip_count = await redis_client.incr(ip_key)
-    if ip_count == 1:
-        await redis_client.expire(ip_key, window)
-    if ip_count > max_attempts:
-        raise TooManyRequestsException(f"登录次数过多,请 {window // 60} 分钟后再试")
-    
-    # 检查账号限流
-    username_key = f"login_limit:username:{username}"
-    username_count = await redis_client.incr(username_key)
-    if username_count == 1:
-        await redis_client.expire(username_key, window)
-    if username_count > max_attempts:
-        raise TooManyRequestsException(f"登录次数过多,请 {window // 60} 分钟后再试")
+    retry_after = await hit_rate_limit(
+        [f"login_limit:ip:{ip}", f"login_limit:username:{username}"],
+        max_attempts,
+        window
+    )
+    if retry_after:
+        raise TooManyRequestsException(
+            f"登录次数过多,请 {math.ceil(retry_after / 60)} 分钟后再试",
+            data={"retry_after": retry_after}
+        )
 
 
 async def clear_login_limit(ip: str, username: str):
@@ -45,5 +114,203 @@ async def clear_login_limit(ip: str, username: str):
     """
     ip_key = f"login_limit:ip:{ip}"
     username_key = f"login_limit:username:{username}"
-    await redis_client.delete(ip_key)
-    await redis_client.delete(username_key)
+    await redis_client.delete(ip_key, username_key)
+
+
+def ip_login_limit(scope: str, max_attempts: int, window: int) -> Callable:
+    """
+    按客户端 IP 限流的依赖(用于无账号维度的登录接口)
+    
+    Args:
+        scope: 限流场景(用于区分键,如 mp)
+        max_attempts: 窗口内最大次数
+        window: 时间窗口(秒)
+    
+    Returns:
+        Callable: FastAPI 依赖函数
+    
+    Usage:
+        @router.post("/login_by_code", dependencies=[Depends(ip_login_limit("mp", 20, 60))])
+    """
+    async def dependency(request: Request) -> None:
+        ip = request.client.host if request.client else "unknown"
+        retry_after = await hit_rate_limit([f"login_limit:{scope}:ip:{ip}"], max_attempts, window)
+        if retry_after:
+            raise TooManyRequestsException(
+                f"请求过于频繁,请 {retry_after} 秒后再试",
+                data={"retry_after": retry_after}
+            )
+    
+    return dependency
+
+
+# KEYS[1]: 令牌桶键(hash: tokens, ts)
+# ARGV[1]: 每秒生成令牌数  ARGV[2]: 桶容量  ARGV[3]: 本次申请的令牌数
+# 返回: {实际发放的令牌数, 无令牌时需要等待的毫秒数}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+
+local retry_after = 0
+if granted == 0 then
+    retry_after = math.ceil((1 - tokens) / rate * 1000)
+end
+return {granted, retry_after}
+"""
+
+
+def client_ip_key(request: Request) -> str:
+    """按客户端 IP 限流"""
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def principal_key(request: Request) -> str:
+    """按登录主体限流(校验 Token 签名,未登录或 Token 无效时按 IP)"""
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        try:
+            sub = decode_token(authorization[7:]).get("sub")
+            if sub:
+                return f"user:{sub}"
+        except JWTError:
+            pass
+    return client_ip_key(request)
+
+
+class TokenBucketLimiter:
+    """
+    令牌桶限流器(Redis 全局桶 + 进程内令牌租约)
+    
+    本地没有可用令牌时,向 Redis 一次申请最多 lease_size 个令牌并在本进程内消费,
+    租约在令牌重新生成所需时间(最长 1 秒)后过期作废。全局发放总量始终受
+    Redis 中的桶约束,不会因多 worker 而超限。被拒绝的键在 retry_after 之前
+    直接在本地拒绝,流量洪峰不会放大为 Redis 请求。
+    """
+    
+    def __init__(
+        self,
+        scope: str,
+        key_func: Callable[[Request], str],
+        rate: float,
+        burst: int,
+        lease_size: int,
+        max_local_keys: int = 10000
+    ):
+        """
+        Args:
+            scope: 限流场景(如 admin、mp),用于区分键
+            key_func: 从请求中提取限流维度的函数
+            rate: 每秒生成令牌数
+            burst: 桶容量(允许的突发请求数)
+            lease_size: 每次从 Redis 预取的令牌数
+            max_local_keys: 进程内租约最大条目数
+        """
+        self.scope = scope
+        self.key_func = key_func
+        self.rate = rate
+        self.burst = burst
+        self.lease_size = max(1, min(lease_size, burst))
+        self.lease_ttl = min(1.0, self.lease_size / rate)
+        self.max_local_keys = max_local_keys
+        self._leases: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._blocked: "OrderedDict[str, float]" = OrderedDict()
+    
+    async def __call__(self, request: Request) -> None:
+        """
+        FastAPI 依赖: 消费一个令牌
+        
+        Args:
+            request: 请求对象
+        
+        Raises:
+            TooManyRequestsException: 没有可用令牌
+        """
+        key = f"rate_limit:{self.scope}:{self.key_func(request)}"
+        now = time.monotonic()
+        
+        # 本地租约中还有令牌,直接放行
+        lease = self._leases.get(key)
+        if lease is not None and lease[0] > 0 and lease[1] > now:
+            self._leases[key] = (lease[0] - 1, lease[1])
+            return
+        
+        # 桶已耗尽且未到可重试时间,直接拒绝
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None:
+            if blocked_until > now:
+                self._reject(blocked_until - now)
+            del self._blocked[key]
+        
+        result = await redis_client.run_script(
+            TOKEN_BUCKET_SCRIPT,
+            [key],
+            [self.rate, self.burst, self.lease_size]
+        )
+        if result is None:
+            # Redis 未连接时放行
+            return
+        
+        granted, retry_after_ms = int(result[0]), int(result[1])
+        if granted == 0:
+            self._leases.pop(key, None)
+            self._remember(self._blocked, key, now + retry_after_ms / 1000)
+            self._reject(retry_after_ms / 1000)
+        
+        self._remember(self._leases, key, (granted - 1, now + self.lease_ttl))
+    
+    def _remember(self, entries: OrderedDict, key: str, value) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_local_keys:
+            entries.popitem(last=False)
+    
+    @staticmethod
+    def _reject(wait_seconds: float) -> None:
+        retry_after = max(1, math.ceil(wait_seconds))
+        raise TooManyRequestsException(
+            f"请求过于频繁,请 {retry_after} 秒后再试",
+            data={"retry_after": retry_after}
+        )
+
+
+def rate_limit(
+    key_func: Callable[[Request], str],
+    rate: float,
+    burst: int,
+    scope: str = "default",
+    lease_size: int = settings.RATE_LIMIT_LEASE_SIZE
+) -> TokenBucketLimiter:
+    """
+    创建令牌桶限流依赖
+    
+    Args:
+        key_func: 限流维度(client_ip_key、principal_key 或自定义函数)
+        rate: 每秒生成令牌数
+        burst: 桶容量
+        scope: 限流场景
+        lease_size: 每次从 Redis 预取的令牌数(1 表示每个请求都访问 Redis)
+    
+    Returns:
+        TokenBucketLimiter: 可直接用于 Depends() 的限流器
+    
+    Usage:
+        app.include_router(router, dependencies=[Depends(rate_limit(principal_key, 10, 20, scope="mp"))])
+    """
+    return TokenBucketLimiter(scope, key_func, rate, burst, lease_size)
@@ -1,8 +1,16 @@
 """
 微信小程序工具类
 """
+import asyncio
+import time
+from typing import Optional, Tuple
+
 import httpx
 from app.core.config import settings
+from app.db.redis import redis_client
+
+# access_token 失效相关错误码(需要强制刷新后重试)
+ACCESS_TOKEN_INVALID_ERRCODES = {40001, 40014, 42001}
 
 
 class WeChatMiniProgram:
@@ -11,6 +19,43 @@ class WeChatMiniProgram:
     def __init__(self):
         self.appid = settings.WECHAT_APPID
         self.secret = settings.WECHAT_SECRET
+        self.client: Optional[httpx.AsyncClient] = None
+        self._token_lock = asyncio.Lock()
+        self._local_token: Optional[Tuple[str, float]] = None
+    
+    @property
+    def token_cache_key(self) -> str:
+        """access_token 缓存键"""
+        return f"wechat:access_token:{self.appid}"
+    
+    @property
+    def token_lock_key(self) -> str:
+        """access_token 刷新锁键"""
+        return f"wechat:access_token:lock:{self.appid}"
+    
+    async def start(self):
+        """创建长连接 HTTP 客户端(应用启动时调用)"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=settings.WECHAT_API_BASE_URL,
+                timeout=settings.WECHAT_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.WECHAT_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.WECHAT_HTTP_MAX_CONNECTIONS
+                )
+            )
+    
+    async def close(self):
+        """关闭 HTTP 客户端(应用关闭时调用)"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        # 未经过 lifespan(如脚本中使用)时按需创建
+        if self.client is None:
+            await self.start()
+        return self.client
     
     async def code2session(self, code: str) -> dict:
         """
@@ -18,7 +63,7 @@ class WeChatMiniProgram:
         
         Args:
             code: wx.login 返回的 code
-            
+        
         Returns:
             dict: {
                 "openid": "xxx",
@@ -26,7 +71,6 @@ class WeChatMiniProgram:
                 "unionid": "xxx"  # 可选
             }
         """
-        url = "https://api.weixin.qq.com/sns/jscode2session"
         params = {
             "appid": self.appid,
             "secret": self.secret,
@@ -34,14 +78,14 @@ class WeChatMiniProgram:
             "grant_type": "authorization_code"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            data = response.json()
-            
-            if "errcode" in data and data["errcode"] != 0:
-                raise Exception(f"微信接口错误: {data.get('errmsg', '未知错误')}")
-            
-            return data
+        client = await self._get_client()
+        response = await client.get("/sns/jscode2session", params=params)
+        data = response.json()
+        
+        if "errcode" in data and data["errcode"] != 0:
+            raise Exception(f"微信接口错误: {data.get('errmsg', '未知错误')}")
+        
+        return data
     
     async def get_phone_number(self, code: str) -> dict:
         """
@@ -49,7 +93,7 @@ class WeChatMiniProgram:
         
         Args:
             code: getPhoneNumber 返回的 code
-            
+        
         Returns:
             dict: {
                 "phone_number": "13800138000",
@@ -57,43 +101,119 @@ class WeChatMiniProgram:
                 "country_code": "86"
             }
         """
-        # 获取 access_token
-        access_token = await self._get_access_token()
+        client = await self._get_client()
         
-        url = f"https://api.weixin.qq.com/wxa/business/getuserphonenumber?access_token={access_token}"
-        data = {"code": code}
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data)
+        # access_token 被其他方刷新导致失效时,强制刷新后重试一次
+        for force_refresh in (False, True):
+            access_token = await self._get_access_token(force_refresh=force_refresh)
+            response = await client.post(
+                "/wxa/business/getuserphonenumber",
+                params={"access_token": access_token},
+                json={"code": code}
+            )
             result = response.json()
+            if result.get("errcode") not in ACCESS_TOKEN_INVALID_ERRCODES:
+                break
+        
+        if result.get("errcode") != 0:
+            raise Exception(f"获取手机号失败: {result.get('errmsg', '未知错误')}")
+        
+        return result.get("phone_info", {})
+    
+    async def _get_access_token(self, force_refresh: bool = False) -> str:
+        """
+        获取 access_token(进程内缓存 -> Redis -> 微信接口)
+        
+        缓存有效期比微信返回的 expires_in 提前 WECHAT_TOKEN_REFRESH_AHEAD 秒结束,
+        在旧 token 仍可用时完成刷新;刷新时进程内用锁、跨 worker 用 Redis 锁保证
+        同一时刻只有一个请求调用微信 token 接口。
+        
+        Args:
+            force_refresh: 是否忽略缓存强制刷新
+        
+        Returns:
+            str: access_token
+        """
+        stale_token = None
+        if force_refresh:
+            stale_token = self._local_token[0] if self._local_token else None
+            self._local_token = None
+        else:
+            token = await self._get_cached_token()
+            if token:
+                return token
+        
+        async with self._token_lock:
+            # 等待锁期间可能已被其他协程刷新
+            token = await self._get_cached_token()
+            if token and token != stale_token:
+                return token
             
-            if result.get("errcode") != 0:
-                raise Exception(f"获取手机号失败: {result.get('errmsg', '未知错误')}")
+            if redis_client.redis is None:
+                return await self._fetch_access_token()
             
-            return result.get("phone_info", {})
+            acquired = await redis_client.set_nx(
+                self.token_lock_key, "1", settings.WECHAT_TOKEN_LOCK_TIMEOUT
+            )
+            if not acquired:
+                # 其他 worker 正在刷新,轮询等待其写入 Redis
+                token = await self._wait_for_refreshed_token(stale_token)
+                if token:
+                    return token
+            
+            try:
+                return await self._fetch_access_token()
+            finally:
+                if acquired:
+                    await redis_client.delete(self.token_lock_key)
+    
+    async def _get_cached_token(self) -> Optional[str]:
+        if self._local_token and self._local_token[1] > time.monotonic():
+            return self._local_token[0]
+        
+        token = await redis_client.get(self.token_cache_key)
+        if token:
+            ttl = await redis_client.ttl(self.token_cache_key)
+            if ttl > 0:
+                self._local_token = (token, time.monotonic() + ttl)
+        return token
     
-    async def _get_access_token(self) -> str:
+    async def _wait_for_refreshed_token(self, stale_token: Optional[str]) -> Optional[str]:
+        deadline = time.monotonic() + settings.WECHAT_TOKEN_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            token = await redis_client.get(self.token_cache_key)
+            if token and token != stale_token:
+                return token
+        return None
+    
+    async def _fetch_access_token(self) -> str:
         """
-        获取 access_token
+        调用微信接口获取 access_token 并写入缓存
         
         Returns:
             str: access_token
         """
-        url = "https://api.weixin.qq.com/cgi-bin/token"
         params = {
             "grant_type": "client_credential",
             "appid": self.appid,
             "secret": self.secret
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            data = response.json()
-            
-            if "errcode" in data and data["errcode"] != 0:
-                raise Exception(f"获取 access_token 失败: {data.get('errmsg', '未知错误')}")
-            
-            return data.get("access_token", "")
+        client = await self._get_client()
+        response = await client.get("/cgi-bin/token", params=params)
+        data = response.json()
+        
+        if "errcode" in data and data["errcode"] != 0:
+            raise Exception(f"获取 access_token 失败: {data.get('errmsg', '未知错误')}")
+        
+        access_token = data.get("access_token", "")
+        cache_seconds = int(data.get("expires_in", 7200)) - settings.WECHAT_TOKEN_REFRESH_AHEAD
+        if access_token and cache_seconds > 0:
+            self._local_token = (access_token, time.monotonic() + cache_seconds)
+            await redis_client.setex(self.token_cache_key, cache_seconds, access_token)
+        
+        return access_token
 
 
 # 创建全局实例
@@ -0,0 +1,68 @@
+"""
+JWT 验签吞吐基准测试
+
+对比每秒可验证的 Access Token 数:
+- jose / pyjwt 后端完整验签(缓存关闭,使用当前配置的算法与密钥)
+- 已验证 Token 缓存命中(模拟同一批活跃用户的重复请求)
+
+Usage:
+    python scripts/bench_jwt.py --tokens 1000 --rounds 20
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.security import crypto, create_access_token, decode_token, generate_jti, load_backend
+
+
+def bench(label: str, tokens, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            decode_token(token)
+    elapsed = time.perf_counter() - start
+    rate = len(tokens) * rounds / elapsed
+    print(f"{label:<28} {rate:>12,.0f} tokens/s  {elapsed / (len(tokens) * rounds) * 1e6:>8.2f} µs/token")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT 验签吞吐基准测试")
+    parser.add_argument("--tokens", type=int, default=1000, help="不同 Token 的数量(活跃用户数)")
+    parser.add_argument("--rounds", type=int, default=20, help="每个 Token 的验证次数")
+    args = parser.parse_args()
+    
+    tokens = [
+        create_access_token({"sub": str(i), "username": f"user{i}", "sid": generate_jti()})
+        for i in range(args.tokens)
+    ]
+    cache = crypto.token_cache
+    max_entries = cache.max_entries
+    backend = crypto.backend
+    
+    results = {}
+    for name in ("jose", "pyjwt"):
+        try:
+            crypto.backend = load_backend(name, backend.algorithm, backend.signing_key, backend.verification_key)
+        except RuntimeError as e:
+            print(f"{name:<28} 跳过: {e}")
+            continue
+        cache.max_entries = 0
+        results[name] = bench(f"{name} 验签(无缓存)", tokens, args.rounds)
+    
+    crypto.backend = backend
+    cache.max_entries = max(max_entries, args.tokens)
+    cache.clear()
+    cached = bench("已验证缓存命中", tokens, args.rounds)
+    cache.max_entries = max_entries
+    
+    baseline = results.get(backend.name) or next(iter(results.values()))
+    print(f"\n缓存命中相对 {backend.name} 验签: {cached / baseline:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
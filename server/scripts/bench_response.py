@@ -0,0 +1,102 @@
+"""
+列表响应序列化基准测试
+
+以一页用户列表(默认 100 行 ORM 对象)为输入,对比每次响应的序列化耗时:
+- 旧路径: 每行 model_validate().model_dump() 得到字典,信封字典再经
+  jsonable_encoder 与 json.dumps(FastAPI 对 response_model=dict 的处理)
+- orjson 信封: 每行仍生成字典,由 success_response 使用 orjson 渲染
+- 类型化信封: typed_response(PageData[UserResponse]) 每行只构建一次模型,
+  由 pydantic-core 直接输出 JSON 字节
+
+Usage:
+    python scripts/bench_response.py --rows 100 --rounds 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.user import AdminUser
+from app.models.role import AdminRole  # noqa: F401  关系映射需要
+from app.models.permission import AdminPermission  # noqa: F401
+from app.models.menu import AdminMenu  # noqa: F401
+from app.schemas.user import UserResponse
+from app.schemas.response import PageData, success_response, typed_response
+
+
+def legacy(users) -> bytes:
+    data = {
+        "items": [UserResponse.model_validate(u).model_dump() for u in users],
+        "total": len(users),
+        "page": 1,
+        "size": len(users)
+    }
+    envelope = {"code": 200, "message": "success", "data": data, "trace_id": ""}
+    return JSONResponse(jsonable_encoder(envelope)).body
+
+
+def orjson_envelope(users) -> bytes:
+    data = {
+        "items": [UserResponse.model_validate(u).model_dump() for u in users],
+        "total": len(users),
+        "page": 1,
+        "size": len(users)
+    }
+    return success_response(data=data).body
+
+
+def typed(users) -> bytes:
+    data = {"items": users, "total": len(users), "page": 1, "size": len(users)}
+    return typed_response(PageData[UserResponse], data).body
+
+
+def bench(label: str, func, users, rounds: int) -> float:
+    func(users)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(users)
+    per_call = (time.perf_counter() - start) / rounds * 1e6
+    print(f"{label:<24} {per_call:>10.1f} µs/响应")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表响应序列化基准测试")
+    parser.add_argument("--rows", type=int, default=100, help="每页行数")
+    parser.add_argument("--rounds", type=int, default=2000, help="重复次数")
+    args = parser.parse_args()
+    
+    now = datetime.now()
+    users = [
+        AdminUser(
+            id=i,
+            username=f"user{i}",
+            password_hash="",
+            real_name=f"用户{i}",
+            phone="13800000000",
+            email=f"user{i}@example.com",
+            status=1,
+            created_at=now
+        )
+        for i in range(1, args.rows + 1)
+    ]
+    
+    # 三种路径输出的 JSON 内容一致
+    assert json.loads(legacy(users)) == json.loads(orjson_envelope(users)) == json.loads(typed(users))
+    
+    before = bench("旧路径(dict + json)", legacy, users, args.rounds)
+    bench("orjson 信封", orjson_envelope, users, args.rounds)
+    after = bench("类型化信封", typed, users, args.rounds)
+    print(f"\n{args.rows} 行分页: 类型化信封相对旧路径 {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
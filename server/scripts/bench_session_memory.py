@@ -0,0 +1,111 @@
+"""
+Refresh Token 存储内存对比
+
+在真实 Redis 上分别写入 N 个会话,用 INFO memory 的 used_memory 差值
+对比两种存储结构,并按比例换算到 100 万个会话:
+
+- 旧结构: 每个会话一个字符串键 refresh_token:{user_id}:{完整 JWT},
+  登出后再写入 token:blacklist:{完整 JWT}
+- 新结构: 每个用户一个哈希 refresh_session:{user_id},字段为会话 ID
+
+脚本只写入 bench: 前缀的键,结束后全部删除;建议在空闲实例或独立 DB 上运行。
+
+Usage:
+    python scripts/bench_session_memory.py --sessions 100000 --per-user 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.services.session_service import SessionEntry
+from app.core.security import create_refresh_token, generate_jti
+
+BATCH_SIZE = 1000
+SCALE = 1_000_000
+
+
+async def used_memory(redis: aioredis.Redis) -> int:
+    info = await redis.info("memory")
+    return int(info["used_memory"])
+
+
+async def write_batches(redis: aioredis.Redis, commands):
+    pipe = redis.pipeline(transaction=False)
+    for index, command in enumerate(commands, start=1):
+        command(pipe)
+        if index % BATCH_SIZE == 0:
+            await pipe.execute()
+    await pipe.execute()
+
+
+async def measure(redis: aioredis.Redis, label: str, commands, sessions: int) -> float:
+    """写入并返回每个会话占用的字节数,测量结束后删除写入的键"""
+    before = await used_memory(redis)
+    await write_batches(redis, commands)
+    after = await used_memory(redis)
+    
+    async for key in redis.scan_iter(match="bench:*", count=BATCH_SIZE):
+        await redis.unlink(key)
+    
+    per_session = (after - before) / sessions
+    print(f"{label:<32} {per_session:>8.1f} B/会话  100 万会话约 {per_session * SCALE / 1024 / 1024:>8.1f} MB")
+    return per_session
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Refresh Token 存储内存对比")
+    parser.add_argument("--sessions", type=int, default=100_000, help="写入的会话数")
+    parser.add_argument("--per-user", type=int, default=2, help="新结构下每个用户的平均会话数")
+    args = parser.parse_args()
+    
+    redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    now = int(time.time())
+    
+    tokens = [
+        (user_id, create_refresh_token({"sub": str(user_id), "username": f"user{user_id}"}))
+        for user_id in range(1, args.sessions + 1)
+    ]
+    
+    print(f"Redis {(await redis.info('server'))['redis_version']}, {args.sessions} 个会话\n")
+    
+    await measure(redis, "旧结构: refresh_token 字符串键", [
+        lambda pipe, u=u, t=t: pipe.set(f"bench:refresh_token:{u}:{t}", "1", ex=ttl)
+        for u, t in tokens
+    ], args.sessions)
+    
+    await measure(redis, "旧结构: token:blacklist 字符串键", [
+        lambda pipe, t=t: pipe.set(f"bench:token:blacklist:{t}", "1", ex=ttl)
+        for _, t in tokens
+    ], args.sessions)
+    
+    def hset(pipe, user_id: int):
+        entry = SessionEntry(
+            session_id=generate_jti(),
+            jti=generate_jti(),
+            expires_at=now + ttl,
+            issued_at=now,
+            ip="192.168.1.100"
+        )
+        key = f"bench:refresh_session:{user_id}"
+        pipe.hset(key, entry.session_id, entry.encode())
+        pipe.expire(key, ttl)
+    
+    await measure(redis, f"新结构: 哈希(每用户 {args.per_user} 个会话)", [
+        lambda pipe, i=i: hset(pipe, i // args.per_user)
+        for i in range(args.sessions)
+    ], args.sessions)
+    
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
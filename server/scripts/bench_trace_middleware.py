@@ -0,0 +1,124 @@
+"""
+TraceID 中间件微基准测试
+
+对比旧的 BaseHTTPMiddleware 实现与纯 ASGI 实现在 `/` 和 `/api/v1/health`
+上的单请求耗时。直接调用 ASGI 应用(不经过网络和 HTTP 客户端),
+数据库会话替换为空实现,只衡量中间件栈本身的开销。
+
+Usage:
+    python scripts/bench_trace_middleware.py --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Request
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.main import app
+from app.db.session import get_read_db
+from app.middleware.trace_id import TraceIDMiddleware
+
+
+class LegacyTraceIDMiddleware(BaseHTTPMiddleware):
+    """旧实现(BaseHTTPMiddleware),仅用于对比"""
+    
+    def __init__(self, app, header_name: str = "X-Trace-ID"):
+        super().__init__(app)
+        self.header_name = header_name
+    
+    async def dispatch(self, request: Request, call_next):
+        trace_id = request.headers.get(self.header_name) or str(uuid.uuid4())
+        request.state.trace_id = trace_id
+        response = await call_next(request)
+        response.headers[self.header_name] = trace_id
+        return response
+
+
+class NullSession:
+    """空数据库会话"""
+    
+    async def execute(self, *args, **kwargs):
+        return None
+
+
+async def null_db():
+    yield NullSession()
+
+
+def use_middleware(middleware_cls) -> None:
+    """替换应用中的 TraceID 中间件并重建中间件栈"""
+    app.user_middleware = [
+        Middleware(middleware_cls, *m.args, **m.kwargs)
+        if m.cls in (TraceIDMiddleware, LegacyTraceIDMiddleware) else m
+        for m in app.user_middleware
+    ]
+    app.middleware_stack = None
+
+
+async def call(path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        pass
+    
+    await app(scope, receive, send)
+
+
+async def bench(path: str, requests: int, rounds: int) -> float:
+    """返回多轮测试中单请求耗时的中位数(微秒)"""
+    for _ in range(200):
+        await call(path)
+    
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call(path)
+        samples.append((time.perf_counter() - start) / requests * 1e6)
+    return statistics.median(samples)
+
+
+async def main(requests: int, rounds: int) -> None:
+    app.dependency_overrides[get_read_db] = null_db
+    
+    print(f"{'路由':<18}{'BaseHTTPMiddleware':>20}{'纯 ASGI':>12}{'提升':>10}")
+    for path in ("/", "/api/v1/health"):
+        use_middleware(LegacyTraceIDMiddleware)
+        before = await bench(path, requests, rounds)
+        use_middleware(TraceIDMiddleware)
+        after = await bench(path, requests, rounds)
+        print(f"{path:<18}{before:>17.1f} µs{after:>9.1f} µs{(before - after) / before:>10.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TraceID 中间件微基准测试")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--rounds", type=int, default=5, help="测试轮数")
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.requests, args.rounds))
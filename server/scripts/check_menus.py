@@ -4,11 +4,11 @@
 import asyncio
 import sys
 from sqlalchemy import select
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models.menu import AdminMenu
 
 async def main():
-    async for db in get_db():
+    async for db in get_read_db():
         result = await db.execute(
             select(AdminMenu)
             .where(AdminMenu.deleted_at.is_(None))
@@ -14,7 +14,7 @@ from app.models.user import AdminUser
 from app.models.role import AdminRole
 from app.models.permission import AdminPermission
 from app.models.menu import AdminMenu
-from app.utils.password import hash_password
+from app.core.security import hash_password
 
 
 from app.core.config import settings
@@ -44,7 +44,7 @@ async def seed_admin():
             # 创建管理员账号
             admin_user = AdminUser(
                 username=admin_username,
-                password_hash=hash_password(admin_password),
+                password_hash=await hash_password(admin_password),
                 real_name=admin_real_name,
                 status=1
             )
@@ -14,6 +14,7 @@ from app.models.menu import AdminMenu
 from app.models.role import AdminRole
 from app.models.user import AdminUser
 from app.models.permission import AdminPermission
+from app.models.loading import load_profile
 
 
 async def seed_menus():
@@ -114,12 +115,18 @@ async def seed_menus():
                 ),
             ]
             
+            # 计算物化路径(父菜单在列表中先于子菜单出现)
+            paths = {0: "/"}
+            for menu in menus:
+                menu.tree_path = f"{paths[menu.parent_id]}{menu.id}/"
+                paths[menu.id] = menu.tree_path
+            
             db.add_all(menus)
             await db.commit()
             
             print("✅ 菜单创建成功!")
             print(f"   共创建 {len(menus)} 个菜单")
-            
+        
         except Exception as e:
             await db.rollback()
             print(f"❌ 创建菜单失败: {str(e)}")
@@ -131,7 +138,7 @@ async def assign_menus_to_roles():
     async with AsyncSessionLocal() as db:
         try:
             # 查询超级管理员角色
-            super_admin_stmt = select(AdminRole).where(AdminRole.code == "SUPER_ADMIN")
+            super_admin_stmt = select(AdminRole).options(*load_profile(AdminRole, "menus")).where(AdminRole.code == "SUPER_ADMIN")
             super_admin_result = await db.execute(super_admin_stmt)
             super_admin_role = super_admin_result.scalar_one_or_none()
             
@@ -148,7 +155,7 @@ async def assign_menus_to_roles():
                 print(f"   分配 {len(all_menus)} 个菜单")
             
             # 查询普通管理员角色
-            admin_stmt = select(AdminRole).where(AdminRole.code == "ADMIN")
+            admin_stmt = select(AdminRole).options(*load_profile(AdminRole, "menus")).where(AdminRole.code == "ADMIN")
             admin_result = await db.execute(admin_stmt)
             admin_role = admin_result.scalar_one_or_none()
             
@@ -161,7 +168,7 @@ async def assign_menus_to_roles():
                 print(f"   分配 {len(admin_menus)} 个菜单")
             
             # 查询普通用户角色
-            user_stmt = select(AdminRole).where(AdminRole.code == "USER")
+            user_stmt = select(AdminRole).options(*load_profile(AdminRole, "menus")).where(AdminRole.code == "USER")
             user_result = await db.execute(user_stmt)
             user_role = user_result.scalar_one_or_none()
             
@@ -172,7 +179,7 @@ async def assign_menus_to_roles():
                 await db.commit()
                 print("✅ 普通用户菜单分配成功!")
                 print(f"   分配 {len(user_menus)} 个菜单")
-            
+        
         except Exception as e:
             await db.rollback()
             print(f"❌ 分配菜单失败: {str(e)}")
@@ -9,12 +9,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from app.db.session import AsyncSessionLocal
 from app.models.role import AdminRole
 from app.models.permission import AdminPermission
 from app.models.menu import AdminMenu
 from app.models.user import AdminUser
+from app.models.loading import load_profile
 from app.core.config import settings
 
 
@@ -150,7 +150,7 @@ async def assign_super_admin_role():
                 return
 
             # 查询管理员用户
-            user_stmt = select(AdminUser).where(AdminUser.username == admin_username)
+            user_stmt = select(AdminUser).options(*load_profile(AdminUser, "roles")).where(AdminUser.username == admin_username)
             user_result = await db.execute(user_stmt)
             admin_user = user_result.scalar_one_or_none()
 
@@ -190,7 +190,7 @@ async def assign_permissions_to_super_admin():
     """给超级管理员角色分配全部权限"""
     async with AsyncSessionLocal() as db:
         try:
-            role_stmt = select(AdminRole).options(selectinload(AdminRole.permissions)).where(AdminRole.code == "SUPER_ADMIN")
+            role_stmt = select(AdminRole).options(*load_profile(AdminRole, "permissions")).where(AdminRole.code == "SUPER_ADMIN")
             role_result = await db.execute(role_stmt)
             super_admin_role = role_result.scalar_one_or_none()
 
@@ -0,0 +1,88 @@
+"""
+微信接口本地模拟服务(用于离线联调和压测)
+
+模拟 jscode2session、获取 access_token、获取手机号三个接口,
+并通过 /stats 返回各接口的调用次数,可用于观察 access_token 是否被重复刷新。
+
+Usage:
+    python scripts/wechat_stub_server.py --port 9000 --latency 50
+    # .env 中设置 WECHAT_API_BASE_URL=http://127.0.0.1:9000
+"""
+import argparse
+import asyncio
+import hashlib
+import uuid
+from collections import Counter
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+stub_app = FastAPI(title="WeChat API Stub")
+calls = Counter()
+valid_tokens = set()
+latency_seconds = 0.0
+
+
+class PhoneNumberRequest(BaseModel):
+    code: str
+
+
+async def _simulate_latency():
+    if latency_seconds > 0:
+        await asyncio.sleep(latency_seconds)
+
+
+@stub_app.get("/sns/jscode2session")
+async def jscode2session(appid: str, secret: str, js_code: str, grant_type: str = "authorization_code"):
+    """模拟 code 换取 openid(同一 code 返回固定 openid)"""
+    calls["jscode2session"] += 1
+    await _simulate_latency()
+    openid = "stub_" + hashlib.md5(js_code.encode("utf-8")).hexdigest()[:24]
+    return {"openid": openid, "session_key": uuid.uuid4().hex}
+
+
+@stub_app.get("/cgi-bin/token")
+async def get_access_token(appid: str, secret: str, grant_type: str = "client_credential"):
+    """模拟获取 access_token(有效期 7200 秒)"""
+    calls["token"] += 1
+    await _simulate_latency()
+    token = uuid.uuid4().hex
+    valid_tokens.add(token)
+    return {"access_token": token, "expires_in": 7200}
+
+
+@stub_app.post("/wxa/business/getuserphonenumber")
+async def get_user_phone_number(access_token: str, body: PhoneNumberRequest):
+    """模拟获取手机号"""
+    calls["getuserphonenumber"] += 1
+    await _simulate_latency()
+    if access_token not in valid_tokens:
+        return {"errcode": 40001, "errmsg": "invalid credential, access_token is invalid or not latest"}
+    return {
+        "errcode": 0,
+        "errmsg": "ok",
+        "phone_info": {
+            "phoneNumber": "13800138000",
+            "purePhoneNumber": "13800138000",
+            "countryCode": "86"
+        }
+    }
+
+
+@stub_app.get("/stats")
+async def stats():
+    """各接口调用次数"""
+    return dict(calls)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="微信接口本地模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0, help="每个请求的模拟延迟(毫秒)")
+    args = parser.parse_args()
+    
+    latency_seconds = args.latency / 1000
+    uvicorn.run(stub_app, host=args.host, port=args.port)